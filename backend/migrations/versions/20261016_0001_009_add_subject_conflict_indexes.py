@@ -0,0 +1,35 @@
+"""add index for subject conflict detection
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16 00:01:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Partial btree for the (student_id, time) equality part of the conflict probe; the
+    # weekday overlap is then checked on the few matching rows (days_mask, migration 010).
+    # The idx_subjects_days GIN index dropped with subjects.days in migration 006 is not
+    # recreated: nothing queries `days` with an array operator any more.
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_subjects_student_time "
+            "ON subjects (student_id, time) WHERE deleted_at IS NULL"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_subjects_student_time")
@@ -0,0 +1,42 @@
+"""add days_mask bit set to subjects
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16 00:02:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add subjects.days_mask (Lunes=1 ... Domingo=64) and backfill it from subjects.days."""
+
+    op.add_column("subjects", sa.Column("days_mask", sa.SmallInteger(), nullable=False, server_default="0"))
+
+    op.execute(
+        """
+        UPDATE subjects
+        SET days_mask =
+              (CASE WHEN 'Lunes' = ANY(days) THEN 1 ELSE 0 END)
+            | (CASE WHEN 'Martes' = ANY(days) THEN 2 ELSE 0 END)
+            | (CASE WHEN 'Miércoles' = ANY(days) THEN 4 ELSE 0 END)
+            | (CASE WHEN 'Jueves' = ANY(days) THEN 8 ELSE 0 END)
+            | (CASE WHEN 'Viernes' = ANY(days) THEN 16 ELSE 0 END)
+            | (CASE WHEN 'Sábado' = ANY(days) THEN 32 ELSE 0 END)
+            | (CASE WHEN 'Domingo' = ANY(days) THEN 64 ELSE 0 END)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("subjects", "days_mask")
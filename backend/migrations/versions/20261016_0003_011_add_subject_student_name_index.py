@@ -0,0 +1,33 @@
+"""add ordered index for listing a student's subjects
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-16 00:03:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SubjectRepository.get_by_student_id filters on student_id and deleted_at IS NULL and
+    # orders by name: this partial index returns the rows already sorted (no Sort node).
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_subjects_student_name_active "
+            "ON subjects (student_id, name) WHERE deleted_at IS NULL"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_subjects_student_name_active")
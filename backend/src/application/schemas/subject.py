@@ -8,7 +8,7 @@ import datetime as dt
 from typing import List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
 
 # ==================== REQUEST SCHEMAS ====================
 
@@ -135,3 +135,7 @@ class SubjectResponse(BaseModel):
     updated_at: dt.datetime
 
     model_config = ConfigDict(from_attributes=True, extra="ignore")
+
+
+# Validates and JSON-encodes a whole list of ORM subjects in one pydantic-core pass
+SUBJECT_LIST_ADAPTER = TypeAdapter(List[SubjectResponse])
@@ -50,6 +50,34 @@ class SubjectUseCases:
             replace=replace,
         )
 
+    def create_subjects(
+        self, student_id: UUID, user_id: UUID, data: List[SubjectCreateRequest], replace: bool = False
+    ) -> List[Subject]:
+        """Create several subjects for a student at once (timetable import)
+
+        Args:
+            student_id: ID of the student
+            user_id: ID of the user creating the subjects
+            data: Subject creation data, one item per subject
+            replace: If True, replace existing conflicting subject(s)
+
+        Returns:
+            Created Subjects
+
+        Raises:
+            ValueError: If validation fails
+            PermissionError: If user doesn't own the student
+        """
+        # Verify student ownership
+        if not self.student_repo.verify_ownership(student_id, user_id):
+            raise PermissionError("Access denied: Student does not belong to user")
+
+        return self.subject_repo.create_many(
+            student_id=student_id,
+            subjects=[item.model_dump(exclude={"student_id"}) for item in data],
+            replace=replace,
+        )
+
     def get_subject_by_id(self, subject_id: UUID, user_id: UUID) -> Subject:
         """Get a subject by ID
 
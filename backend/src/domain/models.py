@@ -10,7 +10,7 @@ from typing import List
 
 from sqlalchemy import JSON, Boolean, CheckConstraint, Column, Date, DateTime
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import ForeignKey, String, Text, Time, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, SmallInteger, String, Text, Time, UniqueConstraint
 from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -68,13 +68,15 @@ class ArrayType(TypeDecorator):
 
     def __init__(self, item_type, pg_kwargs=None):
         self.item_type = item_type
-        self.pg_kwargs = pg_kwargs or {}
+        # Stored as a tuple of items: SQLAlchemy includes these attributes in the
+        # statement cache key (cache_ok=True), so they must be hashable.
+        self.pg_kwargs = tuple(sorted((pg_kwargs or {}).items()))
         super().__init__()
 
     def load_dialect_impl(self, dialect):
         # Use native ARRAY on PostgreSQL, JSON otherwise
         if dialect.name == "postgresql":
-            return dialect.type_descriptor(ARRAY(self.item_type, **self.pg_kwargs))
+            return dialect.type_descriptor(ARRAY(self.item_type, **dict(self.pg_kwargs)))
         return dialect.type_descriptor(JSON)
 
 
@@ -230,6 +232,9 @@ class Subject(Base):
     name = Column(String(255), nullable=False)
     # Store weekdays as simple text array (no enum to avoid serialization issues)
     days = Column(ArrayType(Text), nullable=False)
+    # Same weekdays packed as bits (Lunes=1, Martes=2, ... Domingo=64) so schedule overlap
+    # is an integer AND in SQL on every dialect. Kept in sync with `days` by SubjectRepository.
+    days_mask = Column(SmallInteger, nullable=False, default=0, server_default="0")
     time = Column(Time, nullable=False)
     teacher = Column(String(255), nullable=True)
     color = Column(String(7), nullable=False)
@@ -243,7 +248,23 @@ class Subject(Base):
 
     # Constraints
     # Table constraints removed to keep model cross-dialect compatible during tests.
-    __table_args__ = ()
+    # Indexes back the conflict probe (same student, same time; overlapping days are a
+    # days_mask AND on the few rows left); postgresql_where is ignored on SQLite.
+    __table_args__ = (
+        Index(
+            "idx_subjects_student_time",
+            "student_id",
+            "time",
+            postgresql_where=deleted_at.is_(None),
+        ),
+        # Serves get_by_student_id's ORDER BY name without a separate sort
+        Index(
+            "idx_subjects_student_name_active",
+            "student_id",
+            "name",
+            postgresql_where=deleted_at.is_(None),
+        ),
+    )
 
     # Relationships
     student = relationship("StudentProfile", back_populates="subjects", lazy="noload")
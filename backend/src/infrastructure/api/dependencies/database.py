@@ -16,6 +16,9 @@ def get_db() -> Generator[Session, None, None]:
     Dependency that provides a database session.
 
     Yields a SQLAlchemy session and ensures it's closed after the request.
+    The session acts as the request's unit of work: it is committed once when the
+    endpoint returns and rolled back if it raises, so repositories created with
+    ``autocommit=False`` only need to flush.
 
     Usage:
         @app.get("/items")
@@ -25,5 +28,9 @@ def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
@@ -8,9 +8,16 @@ from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
-from src.application.schemas.subject import SubjectCreateRequest, SubjectResponse, SubjectUpdateRequest
+from src.application.exceptions import ConflictError
+from src.application.schemas.subject import (
+    SUBJECT_LIST_ADAPTER,
+    SubjectCreateRequest,
+    SubjectResponse,
+    SubjectUpdateRequest,
+)
 from src.application.use_cases.subject_use_cases import SubjectUseCases
 from src.domain.models import User
 from src.infrastructure.api.dependencies.auth import get_current_user
@@ -23,7 +30,7 @@ router = APIRouter(prefix="/students/{student_id}/subjects", tags=["subjects"])
 
 def get_subject_use_cases(db: Session = Depends(get_db)) -> SubjectUseCases:
     """Dependency to get SubjectUseCases instance"""
-    subject_repo = SubjectRepository(db)
+    subject_repo = SubjectRepository(db, autocommit=False)
     student_repo = StudentRepository(db)
     return SubjectUseCases(subject_repo, student_repo)
 
@@ -61,30 +68,71 @@ def create_subject(
         return SubjectResponse.model_validate(subject)
     except PermissionError as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except ConflictError as e:
+        raise _conflict_http_exception(e)
     except Exception as e:
-        # Handle conflict specially
-        from src.application.exceptions import ConflictError
-
-        if isinstance(e, ConflictError):
-            # Build a conflicts summary
-            conflicts = []
-            for c in e.conflicts:
-                conflicts.append(
-                    {
-                        "id": str(c.id),
-                        "name": c.name,
-                        "days": c.days,
-                        "time": c.time.strftime("%H:%M") if c.time else None,
-                    }
-                )
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail={"message": "Conflicting subject(s) exist at the same time", "conflicts": conflicts},
-            )
         # Fallback for other errors
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@router.post(
+    "/bulk",
+    response_model=List[SubjectResponse],
+    status_code=status.HTTP_201_CREATED,
+    summary="Create several subjects at once",
+)
+def create_subjects(
+    student_id: UUID,
+    data: List[SubjectCreateRequest],
+    replace: bool = False,
+    current_user: User = Depends(get_current_user),
+    use_cases: SubjectUseCases = Depends(get_subject_use_cases),
+):
+    """
+    Create several subjects for a student in one request (e.g. importing a timetable).
+
+    - **student_id**: UUID of the student (from path)
+    - **body**: List of subjects with the same fields as the single create endpoint
+
+    Conflicts are checked against the existing subjects and between the items themselves.
+    With `replace=true` conflicting subjects are replaced; otherwise nothing is created.
+    """
+    if any(item.student_id is not None and item.student_id != student_id for item in data):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Student ID in path must match student_id in request body"
+        )
+
+    try:
+        subjects = use_cases.create_subjects(student_id, current_user.id, data, replace=replace)
+        return [SubjectResponse.model_validate(s) for s in subjects]
+    except PermissionError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except ConflictError as e:
+        raise _conflict_http_exception(e)
+    except Exception as e:
+        # Fallback for other errors
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _conflict_http_exception(e: ConflictError) -> HTTPException:
+    """Build the 409 response listing the conflicting subjects"""
+    conflicts = []
+    for c in e.conflicts:
+        conflicts.append(
+            {
+                # Items of the same bulk request have no id yet
+                "id": str(c.id) if c.id is not None else None,
+                "name": c.name,
+                "days": c.days,
+                "time": c.time.strftime("%H:%M") if c.time else None,
+            }
+        )
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={"message": "Conflicting subject(s) exist at the same time", "conflicts": conflicts},
+    )
+
+
 @router.get("", response_model=List[SubjectResponse], summary="Get all subjects for a student")
 def get_student_subjects(
     student_id: UUID,
@@ -98,7 +146,10 @@ def get_student_subjects(
     """
     try:
         subjects = use_cases.get_subjects_by_student(student_id=student_id, user_id=current_user.id)
-        return [SubjectResponse.model_validate(s) for s in subjects]
+        # Returning the response directly skips FastAPI's second response_model pass and
+        # jsonable_encoder walk; response_model above still documents the shape
+        body = SUBJECT_LIST_ADAPTER.dump_json(SUBJECT_LIST_ADAPTER.validate_python(subjects, from_attributes=True))
+        return Response(content=body, media_type="application/json")
     except PermissionError as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
 
@@ -122,7 +173,10 @@ def get_subject(
         if subject.student_id != student_id:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Subject not found for this student")
 
-        return SubjectResponse.model_validate(subject)
+        # Serialized here in one pass; returning a Response bypasses the response_model revalidation
+        return Response(
+            content=SubjectResponse.model_validate(subject).model_dump_json(), media_type="application/json"
+        )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except PermissionError as e:
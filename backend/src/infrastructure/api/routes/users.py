@@ -3,6 +3,7 @@ User API endpoints.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
 from src.application.schemas.user import UserResponse, UserUpdateRequest
@@ -25,7 +26,8 @@ def get_current_user_info(current_user: User = Depends(get_current_user)):
     Returns:
         UserResponse: Current user data
     """
-    return UserResponse.model_validate(current_user)
+    # Serialized here in one pass; returning a Response bypasses the response_model revalidation
+    return Response(content=UserResponse.model_validate(current_user).model_dump_json(), media_type="application/json")
 
 
 @router.put("/me", response_model=UserResponse)
@@ -16,6 +16,10 @@ class Settings(BaseSettings):
     db_pool_size: int = 10
     db_max_overflow: int = 20
     db_pool_timeout: int = 30
+    # Recycle pooled connections before the server/pooler drops them as idle
+    db_pool_recycle: int = 1800
+    # Costs one round-trip per checkout; only needed when idle connections get dropped underneath us
+    db_pool_pre_ping: bool = True
 
     # Security
     secret_key: str
@@ -25,12 +29,16 @@ class Settings(BaseSettings):
 
     # AI Integration
     gemini_api_key: str
+    # How long an AI shopping list is reused for identical dinners (0 disables the cache)
+    gemini_cache_ttl_seconds: int = 3600
 
     # Application
     environment: str = "development"
     debug: bool = True
     app_name: str = "Agenda Escolar Pro"
     api_version: str = "v1"
+    # Uvicorn worker processes when run without reload (debug=False)
+    web_concurrency: int = 1
 
     # CORS (for frontend communication)
     # Add your production frontend URL here (e.g., https://yourapp.vercel.app)
@@ -28,8 +28,8 @@ else:
         pool_size=settings.db_pool_size,
         max_overflow=settings.db_max_overflow,
         pool_timeout=settings.db_pool_timeout,
-        pool_recycle=3600,  # Recycle connections after 1 hour
-        pool_pre_ping=True,  # Verify connections before using them
+        pool_recycle=settings.db_pool_recycle,  # Recycle connections before they go stale
+        pool_pre_ping=settings.db_pool_pre_ping,  # Verify connections before using them
         echo=settings.debug,  # SQL query logging in debug mode
         connect_args={
             "options": "-c statement_timeout=30000",  # 30 second timeout
@@ -4,23 +4,88 @@ Subject Repository
 Data access layer for Subject entity
 """
 
+import logging
 from datetime import datetime, time, timezone
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from uuid import UUID
 
+from sqlalchemy import func, inspect
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 
 from src.domain.models import Subject
 
+__all__ = ["SubjectRepository"]
+
+logger = logging.getLogger(__name__)
+
+# Strips Spanish vowel accents so "miércoles" and "miercoles" share one lookup key
+_FOLD_TABLE = str.maketrans("áéíóú", "aeiou")
+
+# Map of folded day names (lowercase, no accents) to proper Spanish format
+_CANONICAL_DAYS = {
+    "lunes": "Lunes",
+    "martes": "Martes",
+    "miercoles": "Miércoles",
+    "jueves": "Jueves",
+    "viernes": "Viernes",
+    "sabado": "Sábado",
+    "domingo": "Domingo",
+}
+
+
+# Bit assigned to each canonical weekday in `Subject.days_mask`
+_DAY_BITS = {
+    "Lunes": 1,
+    "Martes": 2,
+    "Miércoles": 4,
+    "Jueves": 8,
+    "Viernes": 16,
+    "Sábado": 32,
+    "Domingo": 64,
+}
+
+
+@lru_cache(maxsize=256)
+def _normalize_days_cached(days: Tuple) -> Tuple[str, ...]:
+    """Pure conversion behind `SubjectRepository._normalize_days`, memoized by input tuple.
+
+    Schedule UIs send the same handful of day combinations over and over, so the
+    strip/lower/lookup work is done once per distinct input.
+    """
+    normalized = []
+    for day in days:
+        if not day:
+            continue
+        # Lowercase and fold accents for lookup; only valid days are kept
+        key = str(day).strip().lower().translate(_FOLD_TABLE)
+        if key in _CANONICAL_DAYS:
+            normalized.append(_CANONICAL_DAYS[key])
+
+    return tuple(normalized)
+
 
 class SubjectRepository:
     """Repository for subject data access"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, autocommit: bool = True):
         self.db = db
+        # When False, writes are only flushed and the request-scoped session dependency
+        # (api.dependencies.database.get_db) commits once at the end of the request.
+        self._autocommit = autocommit
 
-    def _normalize_days(self, days: List[str]) -> List[str]:
+    def _commit(self) -> None:
+        """Commit the unit of work, or just flush it when the caller owns the transaction."""
+        if self._autocommit:
+            self.db.commit()
+        else:
+            self.db.flush()
+
+    @staticmethod
+    def _normalize_days(days: List[str]) -> List[str]:
         """Normalize weekday strings to title case with proper Spanish accents.
 
         Args:
@@ -32,40 +97,35 @@ class SubjectRepository:
         if not days:
             return []
 
-        # Map of normalized day names (lowercase without accents) to proper Spanish format
-        valid_days = {
-            "lunes": "Lunes",
-            "martes": "Martes",
-            "miercoles": "Miércoles",
-            "miércoles": "Miércoles",
-            "jueves": "Jueves",
-            "viernes": "Viernes",
-            "sabado": "Sábado",
-            "sábado": "Sábado",
-            "domingo": "Domingo",
-        }
-
-        normalized = []
-        for day in days:
-            if not day:
-                continue
-            # Normalize to lowercase for lookup
-            day_lower = str(day).strip().lower()
-            # If it's a valid day, add the properly formatted version
-            if day_lower in valid_days:
-                normalized.append(valid_days[day_lower])
-
-        return normalized
+        # The cached result is a tuple; hand callers their own list
+        return list(_normalize_days_cached(tuple(days)))
+
+    @staticmethod
+    def _days_mask(normalized_days: List[str]) -> int:
+        """Pack normalized weekday names into the `Subject.days_mask` bit set."""
+        mask = 0
+        for day in normalized_days:
+            mask |= _DAY_BITS[day]
+        return mask
+
+    def _conflict_filters(self, student_id: UUID, normalized_days: List[str], time: time) -> tuple:
+        """Same student, same time, not soft-deleted and sharing at least one weekday bit.
+
+        Overlap is a single integer AND on `days_mask`, which every dialect evaluates in SQL
+        (no Postgres-only `&&` and no Python-side filtering for SQLite/JSON).
+        """
+        return (
+            Subject.student_id == student_id,
+            Subject.time == time,
+            Subject.deleted_at.is_(None),
+            Subject.days_mask.op("&")(self._days_mask(normalized_days)) != 0,
+        )
 
     def get_conflicting(self, student_id: UUID, days: List[str], time: time) -> List[Subject]:
         """Return existing subjects for the student that overlap at the same time and days.
 
         Uses `_normalize_days` to clean up the day strings for the DB query.
         """
-        import logging
-
-        logger = logging.getLogger(__name__)
-
         normalized_days = self._normalize_days(days)
         logger.debug("SubjectRepository.get_conflicting - normalized_days: %s (input days: %s)", normalized_days, days)
 
@@ -73,47 +133,57 @@ class SubjectRepository:
         if not normalized_days:
             return []
 
-        # Detect whether the underlying database supports ARRAY overlap
-        supports_overlap = hasattr(Subject.days, "overlap")
-
-        if supports_overlap:
-            # Use native SQL overlap operator (Postgres)
-            return (
-                self.db.query(Subject)
-                .filter(
-                    Subject.student_id == student_id,
-                    Subject.time == time,
-                    Subject.deleted_at.is_(None),
-                    Subject.days.overlap(normalized_days),
-                )
-                .all()
-            )
-        else:
-            # Fallback for SQLite/JSON: fetch candidates and check overlap in Python
-            candidates = (
-                self.db.query(Subject)
-                .filter(Subject.student_id == student_id, Subject.time == time, Subject.deleted_at.is_(None))
-                .all()
-            )
+        # Callers only need what identifies the conflict: `replace` soft-deletes by id and the
+        # 409 payload lists id, name, days and time. Other columns load lazily if ever touched.
+        return (
+            self.db.query(Subject)
+            .options(load_only(Subject.id, Subject.name, Subject.days, Subject.time))
+            .filter(*self._conflict_filters(student_id, normalized_days, time))
+            .all()
+        )
+
+    def _exists_conflict(self, student_id: UUID, days: List[str], time: time) -> bool:
+        """Return True if at least one subject overlaps at the same time and days.
+
+        Cheap probe used by `create` so the common no-conflict path does not
+        hydrate full `Subject` rows: it only selects the id and stops at the first match.
+        """
+        normalized_days = self._normalize_days(days)
+        if not normalized_days:
+            return False
+
+        row = (
+            self.db.query(Subject.id)
+            .filter(*self._conflict_filters(student_id, normalized_days, time))
+            .limit(1)
+            .first()
+        )
+        return row is not None
 
-            result = []
-            nd_set = set(normalized_days)
-            for s in candidates:
-                try:
-                    subject_days = set(s.days or [])
-                except Exception:
-                    subject_days = set()
-                if subject_days & nd_set:
-                    result.append(s)
-            return result
+    def _soft_delete_many(self, subjects: List[Subject]) -> None:
+        """Soft delete the given subjects with a single UPDATE ... WHERE id IN (...).
+
+        Avoids one UPDATE per object on flush. The caller is responsible for committing.
+        """
+        if not subjects:
+            return
+
+        # One timestamp for the whole batch, taken Python-side so it can be mirrored below
+        deleted_at = datetime.now(timezone.utc)
+        self.db.query(Subject).filter(Subject.id.in_([s.id for s in subjects])).update(
+            {Subject.deleted_at: deleted_at}, synchronize_session=False
+        )
+        # Mirror the change on the loaded objects without marking them dirty, so they are
+        # accurate even when only flushing (no commit to expire them).
+        for subject in subjects:
+            set_committed_value(subject, "deleted_at", deleted_at)
 
     def delete_conflicting(self, student_id: UUID, days: List[str], time: time) -> List[Subject]:
         """Soft delete conflicting subjects and return them."""
         conflicts = self.get_conflicting(student_id, days, time)
-        for c in conflicts:
-            c.deleted_at = datetime.now(timezone.utc)
         if conflicts:
-            self.db.commit()
+            self._soft_delete_many(conflicts)
+            self._commit()
         return conflicts
 
     def create(
@@ -136,17 +206,16 @@ class SubjectRepository:
             ConflictError: If a conflict is detected and replace is False
             ValueError: If other DB errors occur
         """
-        # Check for conflicts
-        conflicts = self.get_conflicting(student_id, days, time)
-        if conflicts and not replace:
-            # Let caller decide how to handle (raise a specific exception with the conflicting items)
-            from src.application.exceptions import ConflictError
+        # Check for conflicts: cheap existence probe first, full rows only when we need them
+        if self._exists_conflict(student_id, days, time):
+            conflicts = self.get_conflicting(student_id, days, time)
+            if not replace:
+                # Let caller decide how to handle (raise a specific exception with the conflicting items)
+                from src.application.exceptions import ConflictError
 
-            raise ConflictError(conflicts=conflicts)
+                raise ConflictError(conflicts=conflicts)
 
-        if conflicts and replace:
-            for c in conflicts:
-                c.deleted_at = datetime.now(timezone.utc)
+            self._soft_delete_many(conflicts)
 
         # Ensure teacher is not None to avoid DB NOT NULL constraint from older migrations
         teacher_value = teacher if teacher is not None else ""
@@ -158,6 +227,7 @@ class SubjectRepository:
             student_id=student_id,
             name=name,
             days=normalized_days,
+            days_mask=self._days_mask(normalized_days),
             time=time,
             teacher=teacher_value,
             color=color,
@@ -166,13 +236,77 @@ class SubjectRepository:
 
         self.db.add(subject)
         try:
-            self.db.commit()
-            self.db.refresh(subject)
+            # No refresh: `id` is generated Python-side and the server-default timestamps come
+            # back from the INSERT's RETURNING clause. After a real commit the instance is
+            # expired and reloads lazily, only if the caller reads it.
+            self._commit()
             return subject
         except IntegrityError as e:
             self.db.rollback()
             raise ValueError(f"Failed to create subject: {str(e)}")
 
+    def create_many(self, student_id: UUID, subjects: List[dict], replace: bool = False) -> List[Subject]:
+        """Create several subjects for one student (e.g. a whole timetable import)
+
+        Each item is a dict with the `create` fields (name, days, time, teacher, color, type).
+        Existing subjects are read once and conflicts are resolved in Python against that
+        snapshot (same time and a shared `days_mask` bit), including conflicts between items
+        of the batch itself. Conflicting rows are soft-deleted with one UPDATE and the new
+        rows are written in one flush, which SQLAlchemy batches into a multi-row INSERT.
+
+        If a conflict is found and `replace` is False, a ConflictError is raised and nothing
+        is written. If `replace` is True, existing rows are soft-deleted and, within the
+        batch, a later item replaces an earlier one.
+
+        Raises:
+            ConflictError: If a conflict is detected and replace is False
+            ValueError: If other DB errors occur
+        """
+        existing = self.db.query(Subject).filter(Subject.student_id == student_id, Subject.deleted_at.is_(None)).all()
+
+        to_delete: List[Subject] = []
+        pending: List[Subject] = []
+        for spec in subjects:
+            normalized_days = self._normalize_days(spec.get("days"))
+            mask = self._days_mask(normalized_days)
+            teacher = spec.get("teacher")
+
+            subject = Subject(
+                student_id=student_id,
+                name=spec["name"],
+                days=normalized_days,
+                days_mask=mask,
+                time=spec["time"],
+                teacher=teacher if teacher is not None else "",
+                color=spec["color"],
+                type=spec["type"],
+            )
+
+            conflicts = [s for s in existing + pending if s.time == subject.time and s.days_mask & mask]
+            if conflicts:
+                if not replace:
+                    from src.application.exceptions import ConflictError
+
+                    raise ConflictError(conflicts=conflicts)
+
+                for conflict in conflicts:
+                    if conflict in pending:
+                        pending.remove(conflict)
+                    else:
+                        existing.remove(conflict)
+                        to_delete.append(conflict)
+
+            pending.append(subject)
+
+        self._soft_delete_many(to_delete)
+        self.db.add_all(pending)
+        try:
+            self._commit()
+            return pending
+        except IntegrityError as e:
+            self.db.rollback()
+            raise ValueError(f"Failed to create subjects: {str(e)}")
+
     def get_by_id(self, subject_id: UUID) -> Optional[Subject]:
         """Get subject by ID (excludes soft-deleted)"""
         return self.db.query(Subject).filter(Subject.id == subject_id, Subject.deleted_at.is_(None)).first()
@@ -202,38 +336,89 @@ class SubjectRepository:
     ) -> Optional[Subject]:
         """Update subject
 
-        Use Ellipsis (...) as default to distinguish between "not provided" and "set to None"
+        Use Ellipsis (...) as default to distinguish between "not provided" and "set to None".
+        The change is applied with a single UPDATE (no SELECT beforehand); the row is only
+        read back when it was actually updated. If the subject is already loaded and the
+        provided values equal its current ones, nothing is written and `updated_at` is kept.
         """
-        subject = self.get_by_id(subject_id)
-        if not subject:
-            return None
-
+        values = {}
         if name is not ...:
-            subject.name = name
+            values[Subject.name] = name
         if days is not ...:
             # Clean/normalize the days (just strips whitespace now since we use plain strings)
-            subject.days = self._normalize_days(days)
+            normalized_days = self._normalize_days(days)
+            values[Subject.days] = normalized_days
+            values[Subject.days_mask] = self._days_mask(normalized_days)
         if time is not ...:
-            subject.time = time
+            values[Subject.time] = time
         if teacher is not ...:
-            subject.teacher = teacher
+            values[Subject.teacher] = teacher
         if color is not ...:
-            subject.color = color
+            values[Subject.color] = color
         if type is not ...:
-            subject.type = type
+            values[Subject.type] = type
+
+        # Idempotent PUT: when the subject is already loaded in this session (the use case
+        # fetches it for the ownership check) and nothing differs, skip the write entirely.
+        current = self._loaded_subject(subject_id)
+        if current is not None and self._matches(current, values):
+            return current
 
-        subject.updated_at = datetime.now(timezone.utc)
+        # Timestamp computed by the database as part of the UPDATE
+        values[Subject.updated_at] = func.now()
 
-        self.db.commit()
-        self.db.refresh(subject)
+        updated = (
+            self.db.query(Subject)
+            .filter(Subject.id == subject_id, Subject.deleted_at.is_(None))
+            .update(values, synchronize_session=False)
+        )
+        if not updated:
+            return None
+
+        self._commit()
+        # The bulk UPDATE bypasses the identity map; without a commit to expire it, a copy
+        # loaded earlier in the request would be stale, so overwrite it from the row.
+        return (
+            self.db.query(Subject)
+            .populate_existing()
+            .filter(Subject.id == subject_id, Subject.deleted_at.is_(None))
+            .first()
+        )
+
+    def _loaded_subject(self, subject_id: UUID) -> Optional[Subject]:
+        """Return the active subject from the session identity map, without querying."""
+        subject = self.db.identity_map.get(identity_key(Subject, subject_id))
+        if subject is None or "deleted_at" in inspect(subject).unloaded or subject.deleted_at is not None:
+            return None
         return subject
 
+    @staticmethod
+    def _matches(subject: Subject, values: dict) -> bool:
+        """True if every column in `values` already holds that value on the loaded subject.
+
+        Expired or unloaded attributes count as a mismatch so the check never issues SQL.
+        """
+        unloaded = inspect(subject).unloaded
+        for column, value in values.items():
+            if column.key in unloaded or getattr(subject, column.key) != value:
+                return False
+        return True
+
     def delete(self, subject_id: UUID) -> bool:
-        """Soft delete a subject"""
-        subject = self.get_by_id(subject_id)
-        if not subject:
+        """Soft delete a subject with a single UPDATE"""
+        deleted = (
+            self.db.query(Subject)
+            .filter(Subject.id == subject_id, Subject.deleted_at.is_(None))
+            .update({Subject.deleted_at: func.now()}, synchronize_session=False)
+        )
+        if not deleted:
             return False
 
-        subject.deleted_at = datetime.now(timezone.utc)
-        self.db.commit()
+        # deleted_at is set by the database; make a loaded copy re-read it instead of
+        # still looking active for the rest of the session
+        loaded = self.db.identity_map.get(identity_key(Subject, subject_id))
+        if loaded is not None:
+            self.db.expire(loaded, ["deleted_at"])
+
+        self._commit()
         return True
@@ -6,8 +6,9 @@ from datetime import datetime, timezone
 from typing import Optional
 from uuid import UUID
 
+from sqlalchemy import exists, update
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, raiseload
 
 from src.domain.models import User
 
@@ -15,6 +16,9 @@ from src.domain.models import User
 class UserRepository:
     """Repository for User entity operations."""
 
+    # Columns callers may change through update(); anything else is ignored
+    _UPDATABLE_FIELDS = frozenset({"email", "name", "password_hash", "is_active", "email_verified"})
+
     def __init__(self, db: Session):
         """
         Initialize repository with database session.
@@ -51,8 +55,9 @@ class UserRepository:
         """
         Get user by ID (excluding soft-deleted users).
 
-        Accepts either a UUID instance or a string. For non-Postgres dialects (eg. SQLite tests)
-        compare using the textual representation to avoid Postgres-specific casting in SQL.
+        Accepts either a UUID instance or its string form. The id is normalized to a UUID
+        once and the GUID column type binds it natively on Postgres and as its canonical
+        string on SQLite, so a single primary-key lookup works on both dialects.
 
         Args:
             user_id: User UUID or string
@@ -60,33 +65,18 @@ class UserRepository:
         Returns:
             Optional[User]: User instance or None if not found
         """
-        # Try direct UUID comparison when possible (fast path), but always
-        # fall back to a string-based lookup using CAST to avoid DB-specific
-        # UUID casting issues observed in unit tests (where the compiled SQL
-        # included a Postgres-only ::UUID cast against a SQLite DB).
-        import uuid as _uuid
-
-        from sqlalchemy import String as SAString
-        from sqlalchemy import cast
-
-        # Fast path: if user_id is a UUID instance, try direct comparison first
-        try:
-            if isinstance(user_id, _uuid.UUID):
-                user = self.db.query(User).filter(User.id == user_id, User.deleted_at.is_(None)).first()
-                if user:
-                    return user
-        except Exception:
-            # Be conservative: ignore and fall through to string-based lookup
-            pass
-
-        # Fallback: compare the textual representation of the id. This avoids
-        # Postgres-specific casting in compiled SQL and works across dialects.
-        try:
-            lookup_str = str(_uuid.UUID(str(user_id)))
-        except Exception:
-            lookup_str = str(user_id)
-
-        return self.db.query(User).filter(cast(User.id, SAString(36)) == lookup_str, User.deleted_at.is_(None)).first()
+        if not isinstance(user_id, UUID):
+            try:
+                user_id = UUID(str(user_id))
+            except ValueError:
+                return None
+
+        # Session.get checks the identity map before emitting a PK lookup. raiseload turns any
+        # relationship access on the returned user into an error instead of a hidden extra query.
+        user = self.db.get(User, user_id, options=[raiseload("*")])
+        if user is None or user.deleted_at is not None:
+            return None
+        return user
 
     def get_by_email(self, email: str) -> Optional[User]:
         """
@@ -98,7 +88,9 @@ class UserRepository:
         Returns:
             Optional[User]: User instance or None if not found
         """
-        return self.db.query(User).filter(User.email == email, User.deleted_at.is_(None)).first()
+        return (
+            self.db.query(User).options(raiseload("*")).filter(User.email == email, User.deleted_at.is_(None)).first()
+        )
 
     def update(self, user_id: UUID, **kwargs) -> Optional[User]:
         """
@@ -111,22 +103,22 @@ class UserRepository:
         Returns:
             Optional[User]: Updated user or None if not found
         """
-        user = self.get_by_id(user_id)
-
-        if not user:
-            return None
-
-        updated = False
-        for key, value in kwargs.items():
-            if hasattr(user, key) and value is not None:
-                setattr(user, key, value)
-                updated = True
-
-        if updated:
-            user.updated_at = datetime.now(timezone.utc)
-
+        values = {key: value for key, value in kwargs.items() if key in self._UPDATABLE_FIELDS and value is not None}
+        if not values:
+            return self.get_by_id(user_id)
+        values["updated_at"] = datetime.now(timezone.utc)
+
+        # One UPDATE ... RETURNING instead of SELECT + flush + refresh SELECT; populate_existing
+        # refreshes a copy of the user already loaded in this session.
+        stmt = (
+            update(User)
+            .where(User.id == user_id, User.deleted_at.is_(None))
+            .values(**values)
+            .returning(User)
+            .execution_options(populate_existing=True)
+        )
+        user = self.db.execute(stmt).scalar_one_or_none()
         self.db.commit()
-        self.db.refresh(user)
 
         return user
 
@@ -140,15 +132,15 @@ class UserRepository:
         Returns:
             bool: True if deleted, False if user not found
         """
-        user = self.get_by_id(user_id)
-
-        if not user:
-            return False
-
-        user.deleted_at = datetime.now(timezone.utc)
+        # Single UPDATE; rowcount tells whether an active user matched, so no pre-fetch is needed
+        result = self.db.execute(
+            update(User)
+            .where(User.id == user_id, User.deleted_at.is_(None))
+            .values(deleted_at=datetime.now(timezone.utc))
+        )
         self.db.commit()
 
-        return True
+        return result.rowcount == 1
 
     def exists_by_email(self, email: str) -> bool:
         """
@@ -160,4 +152,6 @@ class UserRepository:
         Returns:
             bool: True if exists, False otherwise
         """
-        return self.db.query(User).filter(User.email == email, User.deleted_at.is_(None)).count() > 0
+        # EXISTS stops at the first matching row (served by the partial index
+        # idx_users_email ... WHERE deleted_at IS NULL) instead of aggregating a COUNT(*).
+        return bool(self.db.query(exists().where(User.email == email, User.deleted_at.is_(None))).scalar())
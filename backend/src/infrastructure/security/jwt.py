@@ -5,14 +5,34 @@ Also provides opaque refresh token generation and hashing.
 
 import hashlib
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Dict, Optional, Tuple
 from uuid import UUID
 
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
+from jose.jwk import Key
 
 from src.infrastructure.config import settings
 
+# Decoded access tokens, keyed by a digest of the token: (payload or None, monotonic expiry).
+# Entries never outlive the token's own `exp`, and at most _JWT_CACHE_TTL seconds.
+_JWT_CACHE: "OrderedDict[bytes, Tuple[Optional[Dict[str, Any]], float]]" = OrderedDict()
+_JWT_CACHE_LOCK = threading.Lock()
+_JWT_CACHE_MAXSIZE = 10_000
+_JWT_CACHE_TTL = 60.0
+# Invalid tokens are remembered briefly so replaying garbage does not redo the HMAC
+_JWT_NEGATIVE_TTL = 5.0
+
+
+@lru_cache(maxsize=4)
+def _signing_key(secret_key: str, algorithm: str) -> Key:
+    """jose key object for the secret, built once instead of on every encode/decode."""
+    return jwk.construct(secret_key, algorithm)
+
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -27,14 +47,15 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     """
     to_encode = data.copy()
 
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
+    if not expires_delta:
+        expires_delta = timedelta(minutes=settings.access_token_expire_minutes)
 
-    to_encode.update({"exp": expire})
+    # `exp` as integer Unix time, which is what jose would turn a datetime into anyway
+    to_encode.update({"exp": int(time.time() + expires_delta.total_seconds())})
 
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    encoded_jwt = jwt.encode(
+        to_encode, _signing_key(settings.secret_key, settings.algorithm), algorithm=settings.algorithm
+    )
 
     return encoded_jwt
 
@@ -46,14 +67,43 @@ def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
     Args:
         token: JWT token string
 
+    Results are cached for a short time (see `_JWT_CACHE_TTL`), so repeated requests
+    with the same token skip signature verification and JSON parsing.
+
     Returns:
         Optional[Dict]: Decoded token payload or None if invalid
     """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    now = time.monotonic()
+
+    with _JWT_CACHE_LOCK:
+        cached = _JWT_CACHE.get(key)
+        if cached is not None:
+            payload, expires_at = cached
+            if expires_at > now:
+                _JWT_CACHE.move_to_end(key)
+                return dict(payload) if payload is not None else None
+            del _JWT_CACHE[key]
+
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        return payload
+        payload = jwt.decode(
+            token, _signing_key(settings.secret_key, settings.algorithm), algorithms=[settings.algorithm]
+        )
+        ttl = _JWT_CACHE_TTL
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            ttl = min(ttl, exp - time.time())
     except JWTError:
-        return None
+        payload = None
+        ttl = _JWT_NEGATIVE_TTL
+
+    if ttl > 0:
+        with _JWT_CACHE_LOCK:
+            _JWT_CACHE[key] = (payload, now + ttl)
+            if len(_JWT_CACHE) > _JWT_CACHE_MAXSIZE:
+                _JWT_CACHE.popitem(last=False)
+
+    return dict(payload) if payload is not None else None
 
 
 def get_user_id_from_token(token: str) -> Optional[UUID]:
@@ -4,39 +4,311 @@ Gemini AI Service
 Service for integrating with Google's Gemini AI for dinner suggestions
 """
 
-import json
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
 from datetime import date, timedelta
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from string import Template
+from typing import Any, Dict, List, Optional, Tuple
 
 import google.generativeai as genai
+import orjson
 
 from src.infrastructure.config import settings
 
+_MODEL_NAME = "gemini-3-flash-preview"
+
+# One configured client per process: GeminiService is built per request by the dinners
+# dependency, so configuring the SDK and creating the model is done lazily, once.
+_model: Optional[genai.GenerativeModel] = None
+_model_lock = threading.Lock()
+
+# Upper bound on concurrent outbound Gemini calls, so a burst of requests queues here
+# instead of tripping the provider's rate limits. Acquired inside the worker thread, so
+# it does not depend on which event loop is running.
+_MAX_CONCURRENT_CALLS = 8
+_generate_slots = threading.BoundedSemaphore(_MAX_CONCURRENT_CALLS)
+
+# Recent shopping lists keyed by a digest of the full prompt: (JSON payload, monotonic expiry).
+# The same dinners and diners always need the same list, so those skip the model call.
+# Dinner suggestions are never cached: asking again is how users get a different one.
+_response_cache: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+_RESPONSE_CACHE_MAXSIZE = 512
+
+
+def _get_model() -> genai.GenerativeModel:
+    """Return the shared GenerativeModel, configuring the SDK on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                genai.configure(api_key=settings.gemini_api_key)
+                _model = genai.GenerativeModel(_MODEL_NAME)
+    return _model
+
+
+# Optional ```json / ``` fences around the payload; group 1 is the payload itself
+_FENCE_RE = re.compile(r"^\s*(?:```(?:json)?)?\s*(.*?)\s*(?:```)?\s*$", re.DOTALL)
+
+
+def _extract_json(text: str) -> str:
+    """Strip surrounding whitespace and markdown code fences from a model response."""
+    return _FENCE_RE.match(text).group(1)
+
+
+@lru_cache(maxsize=512)
+def _restrictions_text(allergies: Tuple[str, ...], excluded_foods: Tuple[str, ...]) -> str:
+    """Restrictions paragraph for prompts, memoized per (allergies, excluded_foods)."""
+    restrictions = []
+
+    if allergies:
+        allergies_formatted = [a.lower() for a in allergies]
+        restrictions.append(
+            f"⚠️ RESTRICCIONES CRÍTICAS - ALERGIAS: {', '.join(allergies_formatted)}. "
+            "NUNCA incluir estos ingredientes bajo ninguna circunstancia."
+        )
+
+    if excluded_foods:
+        excluded_formatted = [f.lower() for f in excluded_foods]
+        restrictions.append(f"❌ NO incluir estos ingredientes: {', '.join(excluded_formatted)}.")
+
+    return " ".join(restrictions) if restrictions else ""
+
+
+# English weekday names as date.strftime("%A") renders them in the C locale, indexed by date.weekday()
+_DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+def _format_day(current_date: date, menus_by_date: Dict[str, Dict[str, Any]]) -> str:
+    """One line of the week context: the school menu for that date, or a note that there is none."""
+    date_str = current_date.isoformat()
+    day_name = _DAY_NAMES[current_date.weekday()]
+
+    menu = menus_by_date.get(date_str)
+    if menu is None:
+        return f"📅 {date_str} ({day_name}): SIN MENÚ ESCOLAR (fin de semana/festivo)"
+
+    dishes = ", ".join(filter(None, (menu.get("first_course"), menu.get("second_course"))))
+    return f"📅 {date_str} ({day_name}): MENÚ ESCOLAR - {dishes}"
+
+
+class _PromptTemplate:
+    """string.Template-style $placeholders, split into literal segments once at import
+
+    substitute() only stringifies the values and joins them with the prebuilt segments,
+    instead of re-scanning the whole prompt body with a regex on every call.
+    """
+
+    __slots__ = ("_literals", "_names")
+
+    def __init__(self, template: str):
+        literals, names, literal, last = [], [], "", 0
+        for match in Template.pattern.finditer(template):
+            literal += template[last : match.start()]
+            last = match.end()
+            if match.group("escaped") is not None:
+                # "$$" is a literal "$", as in string.Template
+                literal += "$"
+                continue
+            name = match.group("named") or match.group("braced")
+            if name is None:
+                raise ValueError(f"Invalid placeholder in prompt template at offset {match.start()}")
+            literals.append(literal)
+            names.append(name)
+            literal = ""
+        literals.append(literal + template[last:])
+        self._literals = tuple(literals)
+        self._names = tuple(names)
+
+    def substitute(self, **values: Any) -> str:
+        parts = [self._literals[0]]
+        for name, literal in zip(self._names, self._literals[1:]):
+            parts.append(str(values[name]))
+            parts.append(literal)
+        return "".join(parts)
+
+
+# Prompt bodies are built once at import; only the $placeholders change per call
+_DAY_PROMPT = _PromptTemplate(
+    """Eres un nutricionista experto especializado en alimentación infantil.
+
+$day_context
+$week_context
+
+$restrictions
+
+🎯 TAREA:
+$prompt_instruction
+
+📋 REQUISITOS:
+- La cena debe ser saludable, equilibrada y apropiada para niños
+- Incluir proteínas, verduras/vegetales y carbohidratos en proporciones adecuadas
+- Evitar repetir los mismos ingredientes principales del menú escolar
+- Considerar el equilibrio nutricional de toda la semana
+- Respetar ESTRICTAMENTE las restricciones alimentarias
+- Proponer un plato real y apetecible para un niño
+
+📤 FORMATO DE RESPUESTA:
+Responde SOLO con un objeto JSON válido con esta estructura exacta:
+{
+    "meal": "Nombre completo del plato sugerido (ej: 'Pechuga de pollo a la plancha con ensalada mixta')",
+    "ingredients": ["ingrediente1", "ingrediente2", "ingrediente3", ...]
+}
+
+IMPORTANTE: No incluyas explicaciones adicionales, solo el JSON."""
+)
+
+_WEEK_PROMPT = _PromptTemplate(
+    """Eres un nutricionista experto especializado en planificación de menús infantiles semanales.
+
+🗓️ PLANIFICACIÓN DE CENAS PARA $days DÍAS:
+$days_context
+
+$restrictions
+
+🎯 TAREA:
+Crea un plan de cenas para estos $days días que:
+1. COMPLEMENTE el menú escolar cuando existe
+2. SEA COMPLETO Y EQUILIBRADO cuando no hay menú escolar
+3. VARÍE los ingredientes principales entre días
+4. MANTENGA EQUILIBRIO NUTRICIONAL durante toda la semana
+5. SEA APETECIBLE para niños
+
+📋 REQUISITOS:
+- Cada cena debe incluir proteínas, verduras y carbohidratos
+- Máxima variedad de ingredientes entre días
+- Respetar ESTRICTAMENTE las restricciones alimentarias
+- Platos reales y prácticos de preparar
+- Considerar que los días con menú escolar la cena debe ser COMPLEMENTARIA
+- Los días sin menú escolar la cena debe ser MÁS COMPLETA
+
+📤 FORMATO DE RESPUESTA:
+Responde SOLO con un array JSON válido con esta estructura exacta:
+[
+    {
+        "date": "YYYY-MM-DD",
+        "meal": "Nombre del plato",
+        "ingredients": ["ingrediente1", "ingrediente2", ...]
+    },
+    ...
+]
+
+IMPORTANTE: Debe haber exactamente $days cenas en el array, una por cada día. No incluyas explicaciones, solo el JSON."""
+)
+
+_SHOPPING_LIST_PROMPT = _PromptTemplate(
+    """Eres un asistente de compras experto especializado en planificación de cenas ligeras.
+
+🛒 CENAS PLANIFICADAS:
+$meals_text
+
+👥 NÚMERO DE COMENSALES: $num_people personas
+
+🎯 TAREA:
+Crea una lista de la compra organizada por categorías con TODOS los ingredientes necesarios para CENAS LIGERAS.
+
+📋 REQUISITOS IMPORTANTES:
+- **CANTIDADES PARA CENAS LIGERAS**: Las porciones deben ser apropiadas para una cena, NO para comida principal
+- Las cantidades deben ser para $num_people personas
+- Agrupar ingredientes por categoría (Carnes y Pescados, Verduras y Hortalizas, Frutas, Lácteos y Huevos, Despensa, Congelados, etc.)
+- Eliminar duplicados y sumar cantidades de ingredientes repetidos
+- Usar cantidades específicas y realistas (ej: "500g de pollo", "2 tomates", "1 litro de leche")
+- Para cenas ligeras, reduce las cantidades en un 25-30% respecto a una comida principal
+- Incluir ingredientes básicos necesarios (aceite, sal, especias básicas)
+- Pensar en cantidades que se venden normalmente en supermercados
+
+💡 EJEMPLO DE CANTIDADES LIGERAS (para 4 personas):
+- Proteína: 400-500g (100-125g por persona)
+- Verduras: 600-800g
+- Carbohidratos: 300-400g (pasta, arroz, pan)
+
+📤 FORMATO DE RESPUESTA:
+Responde SOLO con un array JSON válido:
+[
+    {
+        "category": "Nombre de categoría",
+        "items": ["cantidad + ingrediente", "cantidad + ingrediente", ...]
+    },
+    ...
+]
+
+Ejemplo:
+[
+    {
+        "category": "Carnes y Pescados",
+        "items": ["400g de pechuga de pollo", "300g de salmón fresco"]
+    },
+    {
+        "category": "Verduras y Hortalizas",
+        "items": ["4 tomates medianos", "1 lechuga", "2 pimientos rojos"]
+    }
+]
+
+IMPORTANTE: Solo el JSON, sin explicaciones adicionales. Las cantidades deben ser para CENAS LIGERAS."""
+)
+
 
 class GeminiService:
     """Service for Gemini AI integration"""
 
     def __init__(self):
-        """Initialize Gemini AI client"""
-        genai.configure(api_key=settings.gemini_api_key)
-        self.model = genai.GenerativeModel("gemini-3-flash-preview")
-
-    def _build_restrictions_text(self, allergies: List[str], excluded_foods: List[str]) -> str:
-        """Build restrictions text for prompts"""
-        restrictions = []
+        """Initialize Gemini AI client (shared across instances)"""
+        self.model = _get_model()
 
-        if allergies:
-            allergies_formatted = [a.lower() for a in allergies]
-            restrictions.append(
-                f"⚠️ RESTRICCIONES CRÍTICAS - ALERGIAS: {', '.join(allergies_formatted)}. "
-                "NUNCA incluir estos ingredientes bajo ninguna circunstancia."
-            )
+    async def _generate_json(self, prompt: str, cache: bool = False) -> Any:
+        """Return the parsed JSON answer for a prompt
 
-        if excluded_foods:
-            excluded_formatted = [f.lower() for f in excluded_foods]
-            restrictions.append(f"❌ NO incluir estos ingredientes: {', '.join(excluded_formatted)}.")
+        With cache=True a recent answer for the same prompt is reused. The prompt embeds every
+        input, so it is the cache key. Only answers that parsed successfully are cached.
+        """
+        if not cache or settings.gemini_cache_ttl_seconds <= 0:
+            response = await self._generate(prompt)
+            # Parse JSON from response (Gemini often wraps it in a markdown code block)
+            return orjson.loads(_extract_json(response.text))
+
+        key = hashlib.blake2b(prompt.encode(), digest_size=16).digest()
+        now = time.monotonic()
+
+        with _response_cache_lock:
+            cached = _response_cache.get(key)
+            if cached is not None:
+                payload, expires_at = cached
+                if expires_at > now:
+                    _response_cache.move_to_end(key)
+                    # Parse again so every caller gets its own objects
+                    return orjson.loads(payload)
+                del _response_cache[key]
+
+        response = await self._generate(prompt)
+
+        # Parse JSON from response (Gemini often wraps it in a markdown code block)
+        payload = _extract_json(response.text)
+        result = orjson.loads(payload)
+
+        with _response_cache_lock:
+            _response_cache[key] = (payload, now + settings.gemini_cache_ttl_seconds)
+            if len(_response_cache) > _RESPONSE_CACHE_MAXSIZE:
+                _response_cache.popitem(last=False)
+
+        return result
+
+    async def _generate(self, prompt: str):
+        """Run the blocking SDK call in a worker thread so the event loop keeps serving requests"""
+        return await asyncio.to_thread(self._generate_blocking, prompt)
+
+    def _generate_blocking(self, prompt: str):
+        """Blocking Gemini call, limited to _MAX_CONCURRENT_CALLS at a time"""
+        with _generate_slots:
+            return self.model.generate_content(prompt)
 
-        return " ".join(restrictions) if restrictions else ""
+    def _build_restrictions_text(self, allergies: List[str], excluded_foods: List[str]) -> str:
+        """Build restrictions text for prompts"""
+        return _restrictions_text(tuple(allergies or ()), tuple(excluded_foods or ()))
 
     async def suggest_dinner_for_day(
         self,
@@ -95,49 +367,15 @@ class GeminiService:
             day_context = f"🏠 DÍA SIN MENÚ ESCOLAR ({target_date}) - Fin de semana o festivo"
             prompt_instruction = "Sugiere una cena COMPLETA Y EQUILIBRADA. Analiza los menús de la semana para evitar repetir ingredientes principales y mantener variedad nutricional."
 
-        prompt = f"""Eres un nutricionista experto especializado en alimentación infantil.
-
-{day_context}
-{week_context}
-
-{restrictions}
-
-🎯 TAREA:
-{prompt_instruction}
-
-📋 REQUISITOS:
-- La cena debe ser saludable, equilibrada y apropiada para niños
-- Incluir proteínas, verduras/vegetales y carbohidratos en proporciones adecuadas
-- Evitar repetir los mismos ingredientes principales del menú escolar
-- Considerar el equilibrio nutricional de toda la semana
-- Respetar ESTRICTAMENTE las restricciones alimentarias
-- Proponer un plato real y apetecible para un niño
-
-📤 FORMATO DE RESPUESTA:
-Responde SOLO con un objeto JSON válido con esta estructura exacta:
-{{
-    "meal": "Nombre completo del plato sugerido (ej: 'Pechuga de pollo a la plancha con ensalada mixta')",
-    "ingredients": ["ingrediente1", "ingrediente2", "ingrediente3", ...]
-}}
-
-IMPORTANTE: No incluyas explicaciones adicionales, solo el JSON."""
+        prompt = _DAY_PROMPT.substitute(
+            day_context=day_context,
+            week_context=week_context,
+            restrictions=restrictions,
+            prompt_instruction=prompt_instruction,
+        )
 
         try:
-            response = self.model.generate_content(prompt)
-
-            # Parse JSON from response
-            text = response.text.strip()
-
-            # Remove markdown code blocks if present
-            if text.startswith("```json"):
-                text = text[7:]
-            if text.startswith("```"):
-                text = text[3:]
-            if text.endswith("```"):
-                text = text[:-3]
-            text = text.strip()
-
-            result = json.loads(text)
+            result = await self._generate_json(prompt)
 
             return {"meal": result.get("meal", ""), "ingredients": result.get("ingredients", [])}
 
@@ -171,78 +409,14 @@ IMPORTANTE: No incluyas explicaciones adicionales, solo el JSON."""
         menus_by_date = {menu["date"]: menu for menu in school_menus}
 
         # Build week planning context
-        days_info = []
-        for i in range(days):
-            current_date = start_date + timedelta(days=i)
-            date_str = current_date.strftime("%Y-%m-%d")
-            day_name = current_date.strftime("%A")  # Monday, Tuesday, etc.
-
-            if date_str in menus_by_date:
-                menu = menus_by_date[date_str]
-                dishes = []
-                if menu.get("first_course"):
-                    dishes.append(menu["first_course"])
-                if menu.get("second_course"):
-                    dishes.append(menu["second_course"])
-
-                days_info.append(f"📅 {date_str} ({day_name}): MENÚ ESCOLAR - {', '.join(dishes)}")
-            else:
-                days_info.append(f"📅 {date_str} ({day_name}): SIN MENÚ ESCOLAR (fin de semana/festivo)")
+        days_info = [_format_day(start_date + timedelta(days=i), menus_by_date) for i in range(days)]
 
         days_context = "\n".join(days_info)
 
-        prompt = f"""Eres un nutricionista experto especializado en planificación de menús infantiles semanales.
-
-🗓️ PLANIFICACIÓN DE CENAS PARA {days} DÍAS:
-{days_context}
-
-{restrictions}
-
-🎯 TAREA:
-Crea un plan de cenas para estos {days} días que:
-1. COMPLEMENTE el menú escolar cuando existe
-2. SEA COMPLETO Y EQUILIBRADO cuando no hay menú escolar
-3. VARÍE los ingredientes principales entre días
-4. MANTENGA EQUILIBRIO NUTRICIONAL durante toda la semana
-5. SEA APETECIBLE para niños
-
-📋 REQUISITOS:
-- Cada cena debe incluir proteínas, verduras y carbohidratos
-- Máxima variedad de ingredientes entre días
-- Respetar ESTRICTAMENTE las restricciones alimentarias
-- Platos reales y prácticos de preparar
-- Considerar que los días con menú escolar la cena debe ser COMPLEMENTARIA
-- Los días sin menú escolar la cena debe ser MÁS COMPLETA
-
-📤 FORMATO DE RESPUESTA:
-Responde SOLO con un array JSON válido con esta estructura exacta:
-[
-    {{
-        "date": "YYYY-MM-DD",
-        "meal": "Nombre del plato",
-        "ingredients": ["ingrediente1", "ingrediente2", ...]
-    }},
-    ...
-]
-
-IMPORTANTE: Debe haber exactamente {days} cenas en el array, una por cada día. No incluyas explicaciones, solo el JSON."""
+        prompt = _WEEK_PROMPT.substitute(days=days, days_context=days_context, restrictions=restrictions)
 
         try:
-            response = self.model.generate_content(prompt)
-
-            # Parse JSON from response
-            text = response.text.strip()
-
-            # Remove markdown code blocks if present
-            if text.startswith("```json"):
-                text = text[7:]
-            if text.startswith("```"):
-                text = text[3:]
-            if text.endswith("```"):
-                text = text[:-3]
-            text = text.strip()
-
-            result = json.loads(text)
+            result = await self._generate_json(prompt)
 
             return result
 
@@ -267,71 +441,10 @@ IMPORTANTE: Debe haber exactamente {days} cenas en el array, una por cada día.
             [f"- {dinner['meal']}: {', '.join(dinner.get('ingredients', []))}" for dinner in dinners]
         )
 
-        prompt = f"""Eres un asistente de compras experto especializado en planificación de cenas ligeras.
-
-🛒 CENAS PLANIFICADAS:
-{meals_text}
-
-👥 NÚMERO DE COMENSALES: {num_people} personas
-
-🎯 TAREA:
-Crea una lista de la compra organizada por categorías con TODOS los ingredientes necesarios para CENAS LIGERAS.
-
-📋 REQUISITOS IMPORTANTES:
-- **CANTIDADES PARA CENAS LIGERAS**: Las porciones deben ser apropiadas para una cena, NO para comida principal
-- Las cantidades deben ser para {num_people} personas
-- Agrupar ingredientes por categoría (Carnes y Pescados, Verduras y Hortalizas, Frutas, Lácteos y Huevos, Despensa, Congelados, etc.)
-- Eliminar duplicados y sumar cantidades de ingredientes repetidos
-- Usar cantidades específicas y realistas (ej: "500g de pollo", "2 tomates", "1 litro de leche")
-- Para cenas ligeras, reduce las cantidades en un 25-30% respecto a una comida principal
-- Incluir ingredientes básicos necesarios (aceite, sal, especias básicas)
-- Pensar en cantidades que se venden normalmente en supermercados
-
-💡 EJEMPLO DE CANTIDADES LIGERAS (para 4 personas):
-- Proteína: 400-500g (100-125g por persona)
-- Verduras: 600-800g
-- Carbohidratos: 300-400g (pasta, arroz, pan)
-
-📤 FORMATO DE RESPUESTA:
-Responde SOLO con un array JSON válido:
-[
-    {{
-        "category": "Nombre de categoría",
-        "items": ["cantidad + ingrediente", "cantidad + ingrediente", ...]
-    }},
-    ...
-]
-
-Ejemplo:
-[
-    {{
-        "category": "Carnes y Pescados",
-        "items": ["400g de pechuga de pollo", "300g de salmón fresco"]
-    }},
-    {{
-        "category": "Verduras y Hortalizas",
-        "items": ["4 tomates medianos", "1 lechuga", "2 pimientos rojos"]
-    }}
-]
-
-IMPORTANTE: Solo el JSON, sin explicaciones adicionales. Las cantidades deben ser para CENAS LIGERAS."""
+        prompt = _SHOPPING_LIST_PROMPT.substitute(meals_text=meals_text, num_people=num_people)
 
         try:
-            response = self.model.generate_content(prompt)
-
-            # Parse JSON from response
-            text = response.text.strip()
-
-            # Remove markdown code blocks if present
-            if text.startswith("```json"):
-                text = text[7:]
-            if text.startswith("```"):
-                text = text[3:]
-            if text.endswith("```"):
-                text = text[:-3]
-            text = text.strip()
-
-            result = json.loads(text)
+            result = await self._generate_json(prompt, cache=True)
 
             return result
 
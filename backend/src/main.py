@@ -7,7 +7,8 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
@@ -46,6 +47,8 @@ app = FastAPI(
     version=settings.api_version,
     debug=settings.debug,
     lifespan=lifespan,
+    # orjson encodes the large AI plan / shopping list payloads much faster than stdlib json
+    default_response_class=ORJSONResponse,
 )
 
 # Configure rate limiting
@@ -74,6 +77,9 @@ async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONR
     )
 
 
+# Compress larger responses (AI weekly plans and shopping lists); small JSON bodies are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Configure CORS
 cors_origins = settings.cors_origins_list
 print(f"🌐 CORS origins configured: {cors_origins}")
@@ -85,7 +91,7 @@ app.add_middleware(
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
     allow_headers=["Content-Type", "Authorization", "Accept", "Origin", "X-Requested-With"],
     expose_headers=["Content-Type", "Authorization"],
-    max_age=3600,
+    max_age=86400,  # let browsers cache preflight results for a day
 )
 
 
@@ -138,4 +144,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.debug,
+        # Reload mode is single-process; outside debug, fan out over worker processes
+        workers=1 if settings.debug else settings.web_concurrency,
     )
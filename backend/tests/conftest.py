@@ -9,15 +9,16 @@ os.environ["SECRET_KEY"] = "test-secret-key-for-pytest-runs-only-12345678"
 os.environ["GEMINI_API_KEY"] = "test-gemini-key"
 os.environ["DATABASE_URL"] = "sqlite:///:memory:"
 
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
 
 from src.domain import models  # Import all models to register them
 from src.infrastructure.database import Base
+from src.infrastructure.security.password import pwd_context
 
 # Create an in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -28,27 +29,78 @@ engine = create_engine(
     poolclass=StaticPool,
 )
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy emit BEGIN itself
+# so each test can run inside an outer transaction that is rolled back afterwards.
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
 
-@pytest.fixture(scope="function")
-def db_session() -> Generator:
+
+@event.listens_for(engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing() -> Generator:
     """
-    Create a fresh database session for each test.
-    Creates all tables before the test and drops them after.
+    Hash test passwords with bcrypt's minimum cost (4 rounds) instead of the default 12.
+
+    Hashes are still real bcrypt, so verification against existing cost-12 hashes keeps working.
     """
-    # Create all tables
+    pwd_context.update(bcrypt__rounds=4)
+    yield
+    pwd_context.update(bcrypt__rounds=12)
+
+
+@pytest.fixture(scope="session")
+def db_schema() -> Generator:
+    """Create all tables once for the whole test session."""
     Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
 
-    # Create a new session
-    session = TestingSessionLocal()
+
+@pytest.fixture(scope="function")
+def db_session(db_schema) -> Generator:
+    """
+    Database session for one test, isolated by transaction rollback.
+
+    The session joins an outer transaction on a dedicated connection; its commit()
+    and rollback() calls only release or roll back SAVEPOINTs, and the outer
+    transaction is rolled back after the test so no rows leak into the next one.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
 
     try:
         yield session
     finally:
         session.close()
-        # Drop all tables after the test
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="function")
+def query_counter() -> Generator:
+    """
+    Record the SQL statements sent to the test engine while the test runs.
+
+    Lets tests put an upper bound on round-trips (e.g. `assert len(query_counter) <= 1`)
+    so N+1 patterns show up as failures.
+    """
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
 
 
 @pytest.fixture(scope="function")
@@ -62,8 +114,40 @@ def sample_user_data():
     }
 
 
+@pytest.fixture(scope="function")
+def make_auth_headers(db_session, sample_user_data):
+    """
+    Factory that inserts an active user and mints its access token in-process.
+
+    Skips the register/login HTTP round-trips; returns (headers, user). Defaults to the
+    `sample_user_data` user.
+    """
+    from src.infrastructure.security.jwt import create_access_token
+
+    def _make(email: str = sample_user_data["email"], name: str = sample_user_data["name"]):
+        user = models.User(email=email, name=name, password_hash=sample_user_data["password_hash"])
+        db_session.add(user)
+        # The id is assigned on flush; mint the token before commit() expires the instance so
+        # callers that only need the headers never reload the row
+        db_session.flush()
+        token = create_access_token({"sub": str(user.id)})
+        db_session.commit()
+
+        return {"Authorization": f"Bearer {token}"}, user
+
+    return _make
+
+
+@pytest.fixture(scope="function")
+def auth_headers(make_auth_headers):
+    """Authentication headers and user for the default test user"""
+    return make_auth_headers()
+
+
 # TestClient fixture used by API route unit tests. It overrides the real DB
 # dependency to use the in-memory testing session created in this file.
+import httpx
+import pytest_asyncio
 from fastapi.testclient import TestClient
 
 from src.infrastructure.api.dependencies.database import get_db as real_get_db
@@ -72,21 +156,73 @@ from src.infrastructure.database import get_db as db_get_db
 from src.main import app
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _disable_rate_limiting() -> Generator:
+    """Switch the slowapi limiter off for the run; tests that check it opt back in with `rate_limiter`."""
+    limiter.enabled = False
+    yield
+    limiter.enabled = True
+
+
 @pytest.fixture(scope="function")
-def client(db_session):
-    # Resetear rate limiter entre tests para evitar falsos 429
+def rate_limiter() -> Generator:
+    """Enable the rate limiter, with empty counters, for one test."""
     limiter._limiter.storage.reset()
+    limiter.enabled = True
+    yield limiter
+    limiter.enabled = False
+
+
+@pytest.fixture(scope="session")
+def _shared_test_client() -> Generator:
+    """One TestClient (and app lifespan) for the whole run; routing and schemas are built once."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="function")
+def app_client(_shared_test_client) -> Generator:
+    """The shared TestClient with cookies from earlier tests cleared."""
+    _shared_test_client.cookies.clear()
+    yield _shared_test_client
 
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
 
+# Session handed out by the get_db override. A module-level holder rather than a ContextVar:
+# the shared TestClient runs the app on its own portal thread, which would not see a value
+# set from the test's context.
+_test_db = {"session": None}
+
+
+def _override_get_db():
+    """Stable get_db override (same callable across tests) yielding the current test session."""
+    yield _test_db["session"]
+
+
+@pytest.fixture(scope="function")
+def _db_override(db_session) -> Generator:
+    """Point the app's get_db dependencies at the test session for one test."""
+    _test_db["session"] = db_session
     # Override both get_db variants: routes may import from either module
-    app.dependency_overrides[real_get_db] = override_get_db
-    app.dependency_overrides[db_get_db] = override_get_db
-    client = TestClient(app)
-    yield client
+    app.dependency_overrides[real_get_db] = _override_get_db
+    app.dependency_overrides[db_get_db] = _override_get_db
+    yield
     app.dependency_overrides.pop(real_get_db, None)
     app.dependency_overrides.pop(db_get_db, None)
+    _test_db["session"] = None
+
+
+@pytest.fixture(scope="function")
+def client(_db_override, app_client):
+    yield app_client
+
+
+@pytest_asyncio.fixture(scope="function")
+async def async_client(_db_override) -> AsyncGenerator:
+    """
+    In-process httpx client for async tests.
+
+    Requests go straight into the ASGI app on the test's event loop, without
+    TestClient's portal thread; the app lifespan is not run.
+    """
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as async_test_client:
+        yield async_test_client
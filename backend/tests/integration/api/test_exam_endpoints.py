@@ -2,69 +2,50 @@
 Integration tests for Exam endpoints
 """
 
-# Skip tests when Docker/postgres isn't available
-import docker
+from datetime import date
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from src.domain.models import Exam, StudentProfile
 
-def _docker_available() -> bool:
-    try:
-        client = docker.from_env()
-        client.ping()
-        return True
-    except Exception:
-        return False
 
+def seed_exams(db_session: Session, student_id: str, exams: List[Dict[str, Any]]) -> None:
+    """Insert test exams with one executemany INSERT and commit instead of one POST each"""
+    db_session.execute(
+        insert(Exam),
+        [{**exam, "student_id": UUID(student_id), "date": date.fromisoformat(exam["date"])} for exam in exams],
+    )
+    db_session.commit()
 
-pytestmark = pytest.mark.skipif(
-    not _docker_available(), reason="Docker not available, skipping DB-backed integration tests"
-)
 
-from src.infrastructure.database import get_db
-from src.main import app
+def insert_student(db_session: Session, user_id: UUID, name: str = "Test Student", grade: str = "5º") -> str:
+    """Insert a student profile directly instead of going through POST /students"""
+    student = StudentProfile(user_id=user_id, name=name, school="Colegio Test", grade=grade)
+    db_session.add(student)
+    db_session.flush()
+    student_id = str(student.id)
+    db_session.commit()
+    return student_id
 
 
 @pytest.fixture
-def client(db_session: Session):
-    """Create test client with database override."""
-
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
-
-    app.dependency_overrides[get_db] = override_get_db
-    client = TestClient(app)
-    yield client
-    app.dependency_overrides.clear()
+def exam_student(db_session: Session, make_auth_headers) -> Tuple[Dict[str, str], str]:
+    """(auth headers, student_id) for a student owned by the exam user."""
+    headers, user = make_auth_headers("exam@example.com", "Exam Tester")
+    return headers, insert_student(db_session, user.id)
 
 
 class TestExamEndpoints:
     """Integration tests for exam API endpoints"""
 
-    def register_and_login(self, client: TestClient, email: str = "exam@example.com"):
-        """Helper to register and login a user"""
-        # Register
-        client.post("/api/v1/auth/register", json={"email": email, "password": "SecurePass123!", "name": "Exam Tester"})
-        # Login
-        res = client.post("/api/v1/auth/login", json={"email": email, "password": "SecurePass123!"})
-        token = res.json()["access_token"]
-        return token
-
-    def create_student(self, client: TestClient, token: str):
-        """Helper to create a student"""
-        payload = {"name": "Test Student", "school": "Colegio Test", "grade": "5º"}
-        res = client.post("/api/v1/students", json=payload, headers={"Authorization": f"Bearer {token}"})
-        assert res.status_code == 201
-        return res.json()["id"]
-
-    def test_create_exam(self, client: TestClient):
+    def test_create_exam(self, client: TestClient, exam_student):
         """Test creating a new exam"""
-        token = self.register_and_login(client)
-        student_id = self.create_student(client, token)
+        headers, student_id = exam_student
 
         payload = {
             "subject": "Matemáticas",
@@ -73,9 +54,7 @@ class TestExamEndpoints:
             "notes": "Repasar ejercicios 1-10",
         }
 
-        res = client.post(
-            f"/api/v1/students/{student_id}/exams", json=payload, headers={"Authorization": f"Bearer {token}"}
-        )
+        res = client.post(f"/api/v1/students/{student_id}/exams", json=payload, headers=headers)
 
         assert res.status_code == 201
         data = res.json()
@@ -88,16 +67,13 @@ class TestExamEndpoints:
         assert "created_at" in data
         assert "updated_at" in data
 
-    def test_create_exam_without_notes(self, client: TestClient):
+    def test_create_exam_without_notes(self, client: TestClient, exam_student):
         """Test creating an exam without notes"""
-        token = self.register_and_login(client, email="exam2@example.com")
-        student_id = self.create_student(client, token)
+        headers, student_id = exam_student
 
         payload = {"subject": "Lengua", "date": "2026-03-20", "topic": "Análisis sintáctico"}
 
-        res = client.post(
-            f"/api/v1/students/{student_id}/exams", json=payload, headers={"Authorization": f"Bearer {token}"}
-        )
+        res = client.post(f"/api/v1/students/{student_id}/exams", json=payload, headers=headers)
 
         assert res.status_code == 201
         data = res.json()
@@ -110,27 +86,24 @@ class TestExamEndpoints:
         res = client.post("/api/v1/students/00000000-0000-0000-0000-000000000000/exams", json=payload)
         assert res.status_code == 401
 
-    def test_create_exam_for_another_users_student(self, client: TestClient):
+    def test_create_exam_for_another_users_student(self, client: TestClient, db_session: Session, make_auth_headers):
         """Test creating exam for a student that doesn't belong to the user"""
-        # User 1 creates a student
-        token1 = self.register_and_login(client, email="user1@example.com")
-        student_id = self.create_student(client, token1)
+        # User 1 owns a student
+        _, user1 = make_auth_headers("user1@example.com", "Exam Tester")
+        student_id = insert_student(db_session, user1.id)
 
         # User 2 tries to create an exam for user 1's student
-        token2 = self.register_and_login(client, email="user2@example.com")
+        headers2, _ = make_auth_headers("user2@example.com", "Exam Tester")
 
         payload = {"subject": "Ciencias", "date": "2026-04-05", "topic": "Fotosíntesis"}
 
-        res = client.post(
-            f"/api/v1/students/{student_id}/exams", json=payload, headers={"Authorization": f"Bearer {token2}"}
-        )
+        res = client.post(f"/api/v1/students/{student_id}/exams", json=payload, headers=headers2)
 
         assert res.status_code == 403
 
-    def test_get_exams_for_student(self, client: TestClient):
+    def test_get_exams_for_student(self, client: TestClient, db_session: Session, exam_student):
         """Test retrieving all exams for a student"""
-        token = self.register_and_login(client, email="getexams@example.com")
-        student_id = self.create_student(client, token)
+        headers, student_id = exam_student
 
         # Create multiple exams
         exams = [
@@ -139,11 +112,10 @@ class TestExamEndpoints:
             {"subject": "History", "date": "2026-03-20", "topic": "World War II"},
         ]
 
-        for exam in exams:
-            client.post(f"/api/v1/students/{student_id}/exams", json=exam, headers={"Authorization": f"Bearer {token}"})
+        seed_exams(db_session, student_id, exams)
 
         # Get all exams
-        res = client.get(f"/api/v1/students/{student_id}/exams", headers={"Authorization": f"Bearer {token}"})
+        res = client.get(f"/api/v1/students/{student_id}/exams", headers=headers)
 
         assert res.status_code == 200
         data = res.json()
@@ -153,10 +125,9 @@ class TestExamEndpoints:
         assert data[1]["date"] == "2026-03-15"
         assert data[2]["date"] == "2026-03-20"
 
-    def test_get_exams_with_date_filters(self, client: TestClient):
+    def test_get_exams_with_date_filters(self, client: TestClient, db_session: Session, exam_student):
         """Test retrieving exams with date range filters"""
-        token = self.register_and_login(client, email="filters@example.com")
-        student_id = self.create_student(client, token)
+        headers, student_id = exam_student
 
         # Create exams on different dates
         exams = [
@@ -165,22 +136,17 @@ class TestExamEndpoints:
             {"subject": "History", "date": "2026-03-30", "topic": "Topic 3"},
         ]
 
-        for exam in exams:
-            client.post(f"/api/v1/students/{student_id}/exams", json=exam, headers={"Authorization": f"Bearer {token}"})
+        seed_exams(db_session, student_id, exams)
 
         # Test from_date filter
-        res = client.get(
-            f"/api/v1/students/{student_id}/exams?from_date=2026-03-10", headers={"Authorization": f"Bearer {token}"}
-        )
+        res = client.get(f"/api/v1/students/{student_id}/exams?from_date=2026-03-10", headers=headers)
         assert res.status_code == 200
         data = res.json()
         assert len(data) == 2
         assert all(exam["date"] >= "2026-03-10" for exam in data)
 
         # Test to_date filter
-        res = client.get(
-            f"/api/v1/students/{student_id}/exams?to_date=2026-03-20", headers={"Authorization": f"Bearer {token}"}
-        )
+        res = client.get(f"/api/v1/students/{student_id}/exams?to_date=2026-03-20", headers=headers)
         assert res.status_code == 200
         data = res.json()
         assert len(data) == 2
@@ -189,56 +155,53 @@ class TestExamEndpoints:
         # Test both filters
         res = client.get(
             f"/api/v1/students/{student_id}/exams?from_date=2026-03-10&to_date=2026-03-20",
-            headers={"Authorization": f"Bearer {token}"},
+            headers=headers,
         )
         assert res.status_code == 200
         data = res.json()
         assert len(data) == 1
         assert data[0]["date"] == "2026-03-15"
 
-    def test_get_exam_by_id(self, client: TestClient):
+    def test_get_exam_by_id(self, client: TestClient, exam_student):
         """Test retrieving a specific exam by ID"""
-        token = self.register_and_login(client, email="getone@example.com")
-        student_id = self.create_student(client, token)
+        headers, student_id = exam_student
 
         # Create an exam
         create_res = client.post(
             f"/api/v1/students/{student_id}/exams",
             json={"subject": "Biology", "date": "2026-04-01", "topic": "Cell structure"},
-            headers={"Authorization": f"Bearer {token}"},
+            headers=headers,
         )
         exam_id = create_res.json()["id"]
 
         # Get the exam
-        res = client.get(f"/api/v1/students/{student_id}/exams/{exam_id}", headers={"Authorization": f"Bearer {token}"})
+        res = client.get(f"/api/v1/students/{student_id}/exams/{exam_id}", headers=headers)
 
         assert res.status_code == 200
         data = res.json()
         assert data["id"] == exam_id
         assert data["subject"] == "Biology"
 
-    def test_get_exam_not_found(self, client: TestClient):
+    def test_get_exam_not_found(self, client: TestClient, exam_student):
         """Test retrieving non-existent exam"""
-        token = self.register_and_login(client, email="notfound@example.com")
-        student_id = self.create_student(client, token)
+        headers, student_id = exam_student
 
         res = client.get(
             f"/api/v1/students/{student_id}/exams/00000000-0000-0000-0000-000000000000",
-            headers={"Authorization": f"Bearer {token}"},
+            headers=headers,
         )
 
         assert res.status_code == 404
 
-    def test_update_exam(self, client: TestClient):
+    def test_update_exam(self, client: TestClient, exam_student):
         """Test updating an exam"""
-        token = self.register_and_login(client, email="update@example.com")
-        student_id = self.create_student(client, token)
+        headers, student_id = exam_student
 
         # Create an exam
         create_res = client.post(
             f"/api/v1/students/{student_id}/exams",
             json={"subject": "Physics", "date": "2026-04-10", "topic": "Mechanics"},
-            headers={"Authorization": f"Bearer {token}"},
+            headers=headers,
         )
         exam_id = create_res.json()["id"]
 
@@ -253,7 +216,7 @@ class TestExamEndpoints:
         res = client.put(
             f"/api/v1/students/{student_id}/exams/{exam_id}",
             json=update_payload,
-            headers={"Authorization": f"Bearer {token}"},
+            headers=headers,
         )
 
         assert res.status_code == 200
@@ -263,16 +226,15 @@ class TestExamEndpoints:
         assert data["topic"] == "Quantum Mechanics"
         assert data["notes"] == "Study chapters 5-7"
 
-    def test_update_exam_partial(self, client: TestClient):
+    def test_update_exam_partial(self, client: TestClient, exam_student):
         """Test partial update of an exam"""
-        token = self.register_and_login(client, email="partialupdate@example.com")
-        student_id = self.create_student(client, token)
+        headers, student_id = exam_student
 
         # Create an exam
         create_res = client.post(
             f"/api/v1/students/{student_id}/exams",
             json={"subject": "Chemistry", "date": "2026-04-20", "topic": "Periodic table"},
-            headers={"Authorization": f"Bearer {token}"},
+            headers=headers,
         )
         exam_id = create_res.json()["id"]
 
@@ -282,7 +244,7 @@ class TestExamEndpoints:
         res = client.put(
             f"/api/v1/students/{student_id}/exams/{exam_id}",
             json=update_payload,
-            headers={"Authorization": f"Bearer {token}"},
+            headers=headers,
         )
 
         assert res.status_code == 200
@@ -291,71 +253,64 @@ class TestExamEndpoints:
         assert data["date"] == "2026-04-20"  # Unchanged
         assert data["topic"] == "Periodic table and chemical bonds"  # Changed
 
-    def test_delete_exam(self, client: TestClient):
+    def test_delete_exam(self, client: TestClient, exam_student):
         """Test deleting an exam (hard delete)"""
-        token = self.register_and_login(client, email="delete@example.com")
-        student_id = self.create_student(client, token)
+        headers, student_id = exam_student
 
         # Create an exam
         create_res = client.post(
             f"/api/v1/students/{student_id}/exams",
             json={"subject": "Geography", "date": "2026-05-01", "topic": "Continents"},
-            headers={"Authorization": f"Bearer {token}"},
+            headers=headers,
         )
         exam_id = create_res.json()["id"]
 
         # Delete the exam
-        res = client.delete(
-            f"/api/v1/students/{student_id}/exams/{exam_id}", headers={"Authorization": f"Bearer {token}"}
-        )
+        res = client.delete(f"/api/v1/students/{student_id}/exams/{exam_id}", headers=headers)
 
         assert res.status_code == 204
 
         # Verify it's deleted (should return 404)
-        get_res = client.get(
-            f"/api/v1/students/{student_id}/exams/{exam_id}", headers={"Authorization": f"Bearer {token}"}
-        )
+        get_res = client.get(f"/api/v1/students/{student_id}/exams/{exam_id}", headers=headers)
         assert get_res.status_code == 404
 
-    def test_delete_exam_not_found(self, client: TestClient):
+    def test_delete_exam_not_found(self, client: TestClient, exam_student):
         """Test deleting non-existent exam"""
-        token = self.register_and_login(client, email="deletenotfound@example.com")
-        student_id = self.create_student(client, token)
+        headers, student_id = exam_student
 
         res = client.delete(
             f"/api/v1/students/{student_id}/exams/00000000-0000-0000-0000-000000000000",
-            headers={"Authorization": f"Bearer {token}"},
+            headers=headers,
         )
 
         assert res.status_code == 404
 
-    def test_exams_isolated_by_student(self, client: TestClient):
+    def test_exams_isolated_by_student(self, client: TestClient, exam_student):
         """Test that exams are properly isolated between students"""
-        token = self.register_and_login(client, email="isolation@example.com")
+        headers, student1_id = exam_student
 
-        # Create two students
-        student1_id = self.create_student(client, token)
+        # Create a second student
         student2_payload = {"name": "Second Student", "school": "Another School", "grade": "6º"}
-        res = client.post("/api/v1/students", json=student2_payload, headers={"Authorization": f"Bearer {token}"})
+        res = client.post("/api/v1/students", json=student2_payload, headers=headers)
         student2_id = res.json()["id"]
 
         # Create exam for student 1
         client.post(
             f"/api/v1/students/{student1_id}/exams",
             json={"subject": "Math", "date": "2026-03-15", "topic": "Topic 1"},
-            headers={"Authorization": f"Bearer {token}"},
+            headers=headers,
         )
 
         # Create exam for student 2
         client.post(
             f"/api/v1/students/{student2_id}/exams",
             json={"subject": "Science", "date": "2026-03-15", "topic": "Topic 2"},
-            headers={"Authorization": f"Bearer {token}"},
+            headers=headers,
         )
 
         # Get exams for each student
-        res1 = client.get(f"/api/v1/students/{student1_id}/exams", headers={"Authorization": f"Bearer {token}"})
-        res2 = client.get(f"/api/v1/students/{student2_id}/exams", headers={"Authorization": f"Bearer {token}"})
+        res1 = client.get(f"/api/v1/students/{student1_id}/exams", headers=headers)
+        res2 = client.get(f"/api/v1/students/{student2_id}/exams", headers=headers)
 
         data1 = res1.json()
         data2 = res2.json()
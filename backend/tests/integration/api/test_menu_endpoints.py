@@ -9,28 +9,16 @@ from datetime import date, timedelta
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import insert
 
 from src.application.schemas.menu import MenuItemResponse
-from src.domain.models import MenuItem, StudentProfile, User
-from src.main import app
+from src.domain.models import MenuItem, StudentProfile
 
 
-@pytest.fixture
-def auth_headers(client: TestClient, db_session):
-    """Create a user and return authentication headers"""
-    from src.infrastructure.security.jwt import create_access_token
-    from src.infrastructure.security.password import hash_password
-
-    # Create user
-    user = User(email="testmenu@example.com", name="Test Menu User", password_hash=hash_password("testpassword123"))
-    db_session.add(user)
-    db_session.commit()
-    db_session.refresh(user)
-
-    # Create access token
-    token = create_access_token({"sub": str(user.id)})
-
-    return {"Authorization": f"Bearer {token}"}, user
+def seed_menus(db_session, rows):
+    """Insert test menus with one executemany INSERT, bypassing the repository and ORM units of work"""
+    db_session.execute(insert(MenuItem), rows)
+    db_session.flush()
 
 
 @pytest.fixture
@@ -47,8 +35,7 @@ def sample_student(db_session, auth_headers):
         excluded_foods=["nuts"],
     )
     db_session.add(student)
-    db_session.commit()
-    db_session.refresh(student)
+    db_session.flush()
 
     return student
 
@@ -91,32 +78,31 @@ class TestMenuEndpointsSerialization:
         headers, user = auth_headers
 
         # Create multiple menu items
-        from src.infrastructure.repositories.menu_repository import MenuRepository
-
-        repo = MenuRepository(db_session)
-
-        menu1 = repo.create(
-            student_id=sample_student.id,
-            date=date.today(),
-            first_course="Sopa de verduras",
-            second_course="Merluza al horno",
-            allergens=[],
-        )
-
-        menu2 = repo.create(
-            student_id=sample_student.id,
-            date=date.today() + timedelta(days=1),
-            first_course="Arroz con tomate",
-            second_course="Filete de ternera",
-            allergens=["gluten"],
-        )
-
-        menu3 = repo.create(
-            student_id=sample_student.id,
-            date=date.today() + timedelta(days=2),
-            first_course="Pasta carbonara",
-            second_course="Ensalada césar",
-            allergens=["gluten", "lactose", "egg"],
+        seed_menus(
+            db_session,
+            [
+                {
+                    "student_id": sample_student.id,
+                    "date": date.today(),
+                    "first_course": "Sopa de verduras",
+                    "second_course": "Merluza al horno",
+                    "allergens": [],
+                },
+                {
+                    "student_id": sample_student.id,
+                    "date": date.today() + timedelta(days=1),
+                    "first_course": "Arroz con tomate",
+                    "second_course": "Filete de ternera",
+                    "allergens": ["gluten"],
+                },
+                {
+                    "student_id": sample_student.id,
+                    "date": date.today() + timedelta(days=2),
+                    "first_course": "Pasta carbonara",
+                    "second_course": "Ensalada césar",
+                    "allergens": ["gluten", "lactose", "egg"],
+                },
+            ],
         )
 
         # THIS IS THE CRITICAL TEST - Getting multiple menus
@@ -166,19 +152,20 @@ class TestMenuEndpointsSerialization:
         headers, user = auth_headers
         today = date.today()
 
-        from src.infrastructure.repositories.menu_repository import MenuRepository
-
-        repo = MenuRepository(db_session)
-
         # Create menus across different dates
-        for i in range(5):
-            repo.create(
-                student_id=sample_student.id,
-                date=today + timedelta(days=i),
-                first_course=f"Course {i}",
-                second_course=f"Second {i}",
-                allergens=[],
-            )
+        seed_menus(
+            db_session,
+            [
+                {
+                    "student_id": sample_student.id,
+                    "date": today + timedelta(days=i),
+                    "first_course": f"Course {i}",
+                    "second_course": f"Second {i}",
+                    "allergens": [],
+                }
+                for i in range(5)
+            ],
+        )
 
         # Get with date range
         start_date = (today + timedelta(days=1)).isoformat()
@@ -286,24 +273,23 @@ class TestMenuEndpointsSerialization:
         student1 = StudentProfile(user_id=user.id, name="Student 1", school="School 1", grade="5th")
         student2 = StudentProfile(user_id=user.id, name="Student 2", school="School 2", grade="6th")
         db_session.add_all([student1, student2])
-        db_session.commit()
-        db_session.refresh(student1)
-        db_session.refresh(student2)
-
-        from src.infrastructure.repositories.menu_repository import MenuRepository
-
-        repo = MenuRepository(db_session)
+        db_session.flush()
 
         # Create menus for each student
-        for student in [student1, student2]:
-            for i in range(3):
-                repo.create(
-                    student_id=student.id,
-                    date=date.today() + timedelta(days=i),
-                    first_course=f"Course {i}",
-                    second_course=f"Second {i}",
-                    allergens=[],
-                )
+        seed_menus(
+            db_session,
+            [
+                {
+                    "student_id": student.id,
+                    "date": date.today() + timedelta(days=i),
+                    "first_course": f"Course {i}",
+                    "second_course": f"Second {i}",
+                    "allergens": [],
+                }
+                for student in [student1, student2]
+                for i in range(3)
+            ],
+        )
 
         # Get menus for student1
         response1 = client.get(f"/api/v1/menus/student/{student1.id}", headers=headers)
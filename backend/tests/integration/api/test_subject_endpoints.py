@@ -2,67 +2,47 @@
 Integration tests for Subject endpoints
 """
 
-# Integration tests in this module require a PostgreSQL database (Docker).
-# Skip tests when Docker/postgres isn't available to avoid sqlite/ARRAY incompat issues.
-import docker
-import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
-
-
-def _docker_available() -> bool:
-    try:
-        client = docker.from_env()
-        client.ping()
-        return True
-    except Exception:
-        return False
-
+from typing import Dict, Tuple
 
-pytestmark = pytest.mark.skipif(
-    not _docker_available(), reason="Docker not available, skipping DB-backed integration tests"
-)
+import httpx
+import pytest
 
-from src.infrastructure.database import get_db
+from src.domain.models import StudentProfile
+from src.infrastructure.api.dependencies import database as database_dependency
+from src.infrastructure.api.dependencies.database import get_db
+from src.infrastructure.repositories.subject_repository import SubjectRepository
 from src.main import app
 
 
 @pytest.fixture
-def client(db_session: Session):
-    """Create test client with database override."""
-
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
+def subject_student(db_session, make_auth_headers) -> Tuple[Dict[str, str], str]:
+    """(auth headers, student_id) for a student owned by a fresh user, inserted without the auth/student endpoints."""
+    headers, user = make_auth_headers("subj@example.com", "Subject Tester")
+    student = StudentProfile(user_id=user.id, name="Test Student", school="Colegio Test", grade="5º")
+    db_session.add(student)
+    db_session.flush()
+    student_id = str(student.id)
+    db_session.commit()
+    return headers, student_id
 
-    app.dependency_overrides[get_db] = override_get_db
-    client = TestClient(app)
-    yield client
-    app.dependency_overrides.clear()
 
+@pytest.fixture
+def request_session(async_client, db_session, monkeypatch):
+    """Serve the subject routes through the real get_db, handing it the test session.
 
-class TestSubjectEndpoints:
-    def register_and_login(self, client: TestClient, email: str = "subj@example.com"):
-        # Register
-        client.post(
-            "/api/v1/auth/register", json={"email": email, "password": "SecurePass123!", "name": "Subject Tester"}
-        )
-        # Login
-        res = client.post("/api/v1/auth/login", json={"email": email, "password": "SecurePass123!"})
-        token = res.json()["access_token"]
-        return token
+    The auth dependency keeps the plain override; only the request unit of work
+    (commit on success, rollback on error) runs for real.
+    """
+    monkeypatch.setattr(database_dependency, "SessionLocal", lambda: db_session)
+    app.dependency_overrides.pop(get_db, None)
+    return db_session
 
-    def create_student(self, client: TestClient, token: str):
-        payload = {"name": "Test Student", "school": "Colegio Test", "grade": "5º"}
-        res = client.post("/api/v1/students", json=payload, headers={"Authorization": f"Bearer {token}"})
-        assert res.status_code == 201
-        return res.json()["id"]
 
-    def test_create_subject_without_student_id_and_empty_teacher(self, client: TestClient):
-        token = self.register_and_login(client)
-        student_id = self.create_student(client, token)
+class TestSubjectEndpoints:
+    async def test_create_subject_without_student_id_and_empty_teacher(
+        self, async_client: httpx.AsyncClient, subject_student
+    ):
+        headers, student_id = subject_student
 
         # Payload intentionally omits `student_id` and sets teacher to empty string
         payload = {
@@ -74,9 +54,7 @@ class TestSubjectEndpoints:
             "type": "colegio",
         }
 
-        res = client.post(
-            f"/api/v1/students/{student_id}/subjects", json=payload, headers={"Authorization": f"Bearer {token}"}
-        )
+        res = await async_client.post(f"/api/v1/students/{student_id}/subjects", json=payload, headers=headers)
 
         # Expect success (our previous fix allows omitting student_id in body and treats empty teacher correctly)
         assert res.status_code == 201, res.text
@@ -85,9 +63,14 @@ class TestSubjectEndpoints:
         # teacher may be empty string or null depending on how repository/response serialize it; accept both
         assert data.get("teacher") in (None, "")
 
-    def test_conflict_and_replace_flow(self, client: TestClient):
-        token = self.register_and_login(client, email="conflict@example.com")
-        student_id = self.create_student(client, token)
+    # Uppercase day names simulate the frontend sending enum names; they must conflict the same way.
+    # That case stays in `-m "not slow"` runs so day normalization in the conflict check is always
+    # covered; repeating the flow with canonical names is the slow extra.
+    @pytest.mark.parametrize(
+        "conflicting_days", [["LUNES"], pytest.param(["Lunes", "Domingo"], marks=pytest.mark.slow)]
+    )
+    async def test_conflict_and_replace_flow(self, async_client: httpx.AsyncClient, subject_student, conflicting_days):
+        headers, student_id = subject_student
 
         # Create initial subject at 09:00 on Lunes
         payload1 = {
@@ -98,24 +81,20 @@ class TestSubjectEndpoints:
             "color": "#ff0000",
             "type": "colegio",
         }
-        res1 = client.post(
-            f"/api/v1/students/{student_id}/subjects", json=payload1, headers={"Authorization": f"Bearer {token}"}
-        )
+        res1 = await async_client.post(f"/api/v1/students/{student_id}/subjects", json=payload1, headers=headers)
         assert res1.status_code == 201
         created1 = res1.json()
 
         # Try to create another subject that conflicts (same time and overlapping day)
         payload2 = {
             "name": "Fútbol",
-            "days": ["Lunes", "Domingo"],
+            "days": conflicting_days,
             "time": "09:00",
             "teacher": "",
             "color": "#3b82f6",
             "type": "extraescolar",
         }
-        res2 = client.post(
-            f"/api/v1/students/{student_id}/subjects", json=payload2, headers={"Authorization": f"Bearer {token}"}
-        )
+        res2 = await async_client.post(f"/api/v1/students/{student_id}/subjects", json=payload2, headers=headers)
 
         # Expect conflict response with details
         assert res2.status_code == 409, res2.text
@@ -125,52 +104,45 @@ class TestSubjectEndpoints:
         assert any(c["id"] == created1["id"] for c in conflicts)
 
         # Now replace existing by sending replace=true
-        res3 = client.post(
+        res3 = await async_client.post(
             f"/api/v1/students/{student_id}/subjects?replace=true",
             json=payload2,
-            headers={"Authorization": f"Bearer {token}"},
+            headers=headers,
         )
         assert res3.status_code == 201, res3.text
         created2 = res3.json()
         assert created2["name"] == "Fútbol"
 
         # Verify the original is soft-deleted by trying to GET it (should 404)
-        res_get_old = client.get(
-            f"/api/v1/students/{student_id}/subjects/{created1['id']}", headers={"Authorization": f"Bearer {token}"}
+        res_get_old = await async_client.get(
+            f"/api/v1/students/{student_id}/subjects/{created1['id']}", headers=headers
         )
         assert res_get_old.status_code == 404
 
-    def test_conflict_with_uppercase_days(self, client: TestClient):
-        token = self.register_and_login(client, email="upper@example.com")
-        student_id = self.create_student(client, token)
 
-        payload1 = {
-            "name": "Música",
-            "days": ["Lunes"],
-            "time": "10:00",
-            "teacher": "Luis",
-            "color": "#00ff00",
-            "type": "colegio",
-        }
-        res1 = client.post(
-            f"/api/v1/students/{student_id}/subjects", json=payload1, headers={"Authorization": f"Bearer {token}"}
-        )
-        assert res1.status_code == 201
+class TestRequestSession:
+    async def test_successful_request_commits_and_failed_request_rolls_back(
+        self, async_client: httpx.AsyncClient, subject_student, request_session, monkeypatch
+    ):
+        headers, student_id = subject_student
+        url = f"/api/v1/students/{student_id}/subjects"
+        payload = {"name": "Matemáticas", "days": ["Lunes"], "time": "09:00", "color": "#ff0000", "type": "colegio"}
 
-        # Use uppercase day names in payload to simulate frontend sending enum names
-        payload2 = {
-            "name": "Piano",
-            "days": ["LUNES"],
-            "time": "10:00",
-            "teacher": "",
-            "color": "#0000ff",
-            "type": "extraescolar",
-        }
-        res2 = client.post(
-            f"/api/v1/students/{student_id}/subjects", json=payload2, headers={"Authorization": f"Bearer {token}"}
-        )
-        # Should still detect conflict (no server error)
-        assert res2.status_code == 409, res2.text
-        body = res2.json()
-        assert "conflicts" in body["detail"]
-        assert len(body["detail"]["conflicts"]) >= 1
+        res1 = await async_client.post(url, json=payload, headers=headers)
+        assert res1.status_code == 201, res1.text
+
+        # The second request flushes its INSERT and then fails before the request ends
+        flush = SubjectRepository._commit
+
+        def flush_then_fail(self):
+            flush(self)
+            raise RuntimeError("failure after the INSERT was flushed")
+
+        monkeypatch.setattr(SubjectRepository, "_commit", flush_then_fail)
+        res2 = await async_client.post(url, json={**payload, "name": "Lengua", "time": "10:00"}, headers=headers)
+        assert res2.status_code == 400
+        monkeypatch.setattr(SubjectRepository, "_commit", flush)
+
+        res = await async_client.get(url, headers=headers)
+        assert res.status_code == 200
+        assert [s["name"] for s in res.json()] == ["Matemáticas"]
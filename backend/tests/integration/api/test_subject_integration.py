@@ -7,32 +7,18 @@ and subject CRUD operations to catch issues before deployment.
 
 from datetime import date, time, timedelta
 
+import httpx
 import pytest
-from fastapi.testclient import TestClient
 
 from src.application.schemas.subject import SubjectResponse
-from src.domain.models import StudentProfile, Subject, User
+from src.domain.models import StudentProfile, Subject
 from src.main import app
 
 
 @pytest.fixture
-def auth_headers(client: TestClient, db_session):
-    """Create a user and return authentication headers"""
-    from src.infrastructure.security.jwt import create_access_token
-    from src.infrastructure.security.password import hash_password
-
-    # Create user
-    user = User(
-        email="testsubject@example.com", name="Test Subject User", password_hash=hash_password("testpassword123")
-    )
-    db_session.add(user)
-    db_session.commit()
-    db_session.refresh(user)
-
-    # Create access token
-    token = create_access_token({"sub": str(user.id)})
-
-    return {"Authorization": f"Bearer {token}"}, user
+def auth_headers(make_auth_headers):
+    """Create a user and return authentication headers (no password hashing; the password is never used)"""
+    return make_auth_headers("testsubject@example.com", "Test Subject User")
 
 
 @pytest.fixture
@@ -50,7 +36,6 @@ def sample_student(db_session, auth_headers):
     )
     db_session.add(student)
     db_session.commit()
-    db_session.refresh(student)
 
     return student
 
@@ -58,7 +43,9 @@ def sample_student(db_session, auth_headers):
 class TestSubjectEndpointsSerialization:
     """Test suite specifically for Subject Pydantic serialization issues"""
 
-    def test_create_subject_and_serialize(self, client: TestClient, auth_headers, sample_student, db_session):
+    async def test_create_subject_and_serialize(
+        self, async_client: httpx.AsyncClient, auth_headers, sample_student, db_session
+    ):
         """Test creating a subject and serializing the response"""
         headers, user = auth_headers
 
@@ -71,7 +58,9 @@ class TestSubjectEndpointsSerialization:
             "type": "colegio",
         }
 
-        response = client.post(f"/api/v1/students/{sample_student.id}/subjects", json=payload, headers=headers)
+        response = await async_client.post(
+            f"/api/v1/students/{sample_student.id}/subjects", json=payload, headers=headers
+        )
 
         assert response.status_code == 201
         data = response.json()
@@ -88,7 +77,9 @@ class TestSubjectEndpointsSerialization:
         # This line will trigger RecursionError if relationships are loaded
         assert "student" not in data  # Should not include relationship
 
-    def test_get_student_subjects_serialization(self, client: TestClient, auth_headers, sample_student, db_session):
+    async def test_get_student_subjects_serialization(
+        self, async_client: httpx.AsyncClient, auth_headers, sample_student, db_session
+    ):
         """Test getting multiple subjects - this is where RecursionError typically occurs"""
         headers, user = auth_headers
 
@@ -128,7 +119,7 @@ class TestSubjectEndpointsSerialization:
         )
 
         # THIS IS THE CRITICAL TEST - Getting multiple subjects
-        response = client.get(f"/api/v1/students/{sample_student.id}/subjects", headers=headers)
+        response = await async_client.get(f"/api/v1/students/{sample_student.id}/subjects", headers=headers)
 
         assert response.status_code == 200
         data = response.json()
@@ -176,7 +167,9 @@ class TestSubjectEndpointsSerialization:
         except RecursionError as e:
             pytest.fail(f"RecursionError occurred during Pydantic serialization: {e}")
 
-    def test_update_subject_serialization(self, client: TestClient, auth_headers, sample_student, db_session):
+    async def test_update_subject_serialization(
+        self, async_client: httpx.AsyncClient, auth_headers, sample_student, db_session
+    ):
         """Test updating a subject and serializing response"""
         headers, user = auth_headers
 
@@ -196,7 +189,7 @@ class TestSubjectEndpointsSerialization:
 
         update_payload = {"name": "Updated Name", "teacher": "Updated Teacher", "color": "#00FF00"}
 
-        response = client.put(
+        response = await async_client.put(
             f"/api/v1/students/{sample_student.id}/subjects/{subject.id}", json=update_payload, headers=headers
         )
 
@@ -211,7 +204,41 @@ class TestSubjectEndpointsSerialization:
         assert data["type"] == "colegio"
         assert "student" not in data
 
-    def test_update_subject_with_time_string(self, client: TestClient, auth_headers, sample_student, db_session):
+    async def test_update_subject_noop_keeps_updated_at(
+        self, async_client: httpx.AsyncClient, auth_headers, sample_student, db_session
+    ):
+        """Test that sending back unchanged values does not write or bump updated_at"""
+        headers, user = auth_headers
+
+        from src.infrastructure.repositories.subject_repository import SubjectRepository
+
+        repo = SubjectRepository(db_session)
+
+        subject = repo.create(
+            student_id=sample_student.id,
+            name="Same Name",
+            days=["Lunes"],
+            time=time(9, 0),
+            teacher="Same Teacher",
+            color="#FF0000",
+            type="colegio",
+        )
+        original_updated_at = subject.updated_at
+
+        update_payload = {"name": "Same Name", "days": ["lunes"], "teacher": "Same Teacher", "color": "#FF0000"}
+
+        response = await async_client.put(
+            f"/api/v1/students/{sample_student.id}/subjects/{subject.id}", json=update_payload, headers=headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["name"] == "Same Name"
+        db_session.expire_all()
+        assert repo.get_by_id(subject.id).updated_at == original_updated_at
+
+    async def test_update_subject_with_time_string(
+        self, async_client: httpx.AsyncClient, auth_headers, sample_student, db_session
+    ):
         """Test updating subject with time as string (frontend sends strings)"""
         headers, user = auth_headers
 
@@ -232,7 +259,7 @@ class TestSubjectEndpointsSerialization:
         # Update with time as string
         update_payload = {"time": "14:30:00"}
 
-        response = client.put(
+        response = await async_client.put(
             f"/api/v1/students/{sample_student.id}/subjects/{subject.id}", json=update_payload, headers=headers
         )
 
@@ -243,8 +270,8 @@ class TestSubjectEndpointsSerialization:
         assert "14:30" in data["time"]
         assert "student" not in data
 
-    def test_create_multiple_subjects_different_times(
-        self, client: TestClient, auth_headers, sample_student, db_session
+    async def test_create_multiple_subjects_different_times(
+        self, async_client: httpx.AsyncClient, auth_headers, sample_student, db_session
     ):
         """Test creating multiple subjects at different times"""
         headers, user = auth_headers
@@ -278,14 +305,16 @@ class TestSubjectEndpointsSerialization:
 
         created_ids = []
         for subject_data in subjects_data:
-            response = client.post(f"/api/v1/students/{sample_student.id}/subjects", json=subject_data, headers=headers)
+            response = await async_client.post(
+                f"/api/v1/students/{sample_student.id}/subjects", json=subject_data, headers=headers
+            )
             assert response.status_code == 201
             data = response.json()
             created_ids.append(data["id"])
             assert "student" not in data
 
         # Get all subjects
-        response = client.get(f"/api/v1/students/{sample_student.id}/subjects", headers=headers)
+        response = await async_client.get(f"/api/v1/students/{sample_student.id}/subjects", headers=headers)
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 3
@@ -294,7 +323,9 @@ class TestSubjectEndpointsSerialization:
         for item in data:
             assert "student" not in item
 
-    def test_get_single_subject_by_id(self, client: TestClient, auth_headers, sample_student, db_session):
+    async def test_get_single_subject_by_id(
+        self, async_client: httpx.AsyncClient, auth_headers, sample_student, db_session
+    ):
         """Test getting a single subject by ID"""
         headers, user = auth_headers
 
@@ -312,7 +343,9 @@ class TestSubjectEndpointsSerialization:
             type="extraescolar",
         )
 
-        response = client.get(f"/api/v1/students/{sample_student.id}/subjects/{subject.id}", headers=headers)
+        response = await async_client.get(
+            f"/api/v1/students/{sample_student.id}/subjects/{subject.id}", headers=headers
+        )
 
         assert response.status_code == 200
         data = response.json()
@@ -321,7 +354,9 @@ class TestSubjectEndpointsSerialization:
         assert data["name"] == "Single Subject Test"
         assert "student" not in data
 
-    def test_delete_subject_serialization(self, client: TestClient, auth_headers, sample_student, db_session):
+    async def test_delete_subject_serialization(
+        self, async_client: httpx.AsyncClient, auth_headers, sample_student, db_session
+    ):
         """Test deleting a subject"""
         headers, user = auth_headers
 
@@ -340,16 +375,20 @@ class TestSubjectEndpointsSerialization:
         )
 
         # Delete
-        response = client.delete(f"/api/v1/students/{sample_student.id}/subjects/{subject.id}", headers=headers)
+        response = await async_client.delete(
+            f"/api/v1/students/{sample_student.id}/subjects/{subject.id}", headers=headers
+        )
 
         assert response.status_code == 204
 
         # Verify it's deleted
-        response = client.get(f"/api/v1/students/{sample_student.id}/subjects/{subject.id}", headers=headers)
+        response = await async_client.get(
+            f"/api/v1/students/{sample_student.id}/subjects/{subject.id}", headers=headers
+        )
         assert response.status_code == 404
 
-    def test_create_subject_with_conflict_without_replace(
-        self, client: TestClient, auth_headers, sample_student, db_session
+    async def test_create_subject_with_conflict_without_replace(
+        self, async_client: httpx.AsyncClient, auth_headers, sample_student, db_session
     ):
         """Test creating conflicting subject without replace flag"""
         headers, user = auth_headers
@@ -379,14 +418,18 @@ class TestSubjectEndpointsSerialization:
             "type": "colegio",
         }
 
-        response = client.post(f"/api/v1/students/{sample_student.id}/subjects", json=payload, headers=headers)
+        response = await async_client.post(
+            f"/api/v1/students/{sample_student.id}/subjects", json=payload, headers=headers
+        )
 
         # Should return conflict error
         assert response.status_code == 409
         data = response.json()
         assert "detail" in data
 
-    def test_create_subject_with_replace_flag(self, client: TestClient, auth_headers, sample_student, db_session):
+    async def test_create_subject_with_replace_flag(
+        self, async_client: httpx.AsyncClient, auth_headers, sample_student, db_session
+    ):
         """Test creating subject with replace=True for conflicts"""
         headers, user = auth_headers
 
@@ -415,7 +458,9 @@ class TestSubjectEndpointsSerialization:
             "type": "colegio",
         }
 
-        response = client.post(f"/api/v1/students/{sample_student.id}/subjects?replace=true", json=payload, headers=headers)
+        response = await async_client.post(
+            f"/api/v1/students/{sample_student.id}/subjects?replace=true", json=payload, headers=headers
+        )
 
         assert response.status_code == 201
         data = response.json()
@@ -423,13 +468,89 @@ class TestSubjectEndpointsSerialization:
         assert "student" not in data
 
         # Old subject should be soft-deleted
-        all_subjects = client.get(f"/api/v1/students/{sample_student.id}/subjects", headers=headers)
+        all_subjects = await async_client.get(f"/api/v1/students/{sample_student.id}/subjects", headers=headers)
         subjects_list = all_subjects.json()
         # Should only have the new one
         assert len(subjects_list) == 1
         assert subjects_list[0]["name"] == "New Subject"
 
-    def test_subject_type_case_insensitive(self, client: TestClient, auth_headers, sample_student, db_session):
+    async def test_bulk_create_subjects(
+        self, async_client: httpx.AsyncClient, auth_headers, sample_student, db_session
+    ):
+        """Test importing several subjects in one request, replacing an existing conflict"""
+        headers, user = auth_headers
+
+        from src.infrastructure.repositories.subject_repository import SubjectRepository
+
+        repo = SubjectRepository(db_session)
+        repo.create(
+            student_id=sample_student.id,
+            name="Old Subject",
+            days=["Lunes"],
+            time=time(9, 0),
+            teacher="Old Teacher",
+            color="#FF0000",
+            type="colegio",
+        )
+
+        payload = [
+            {
+                "name": "Matemáticas",
+                "days": ["lunes", "Miércoles"],
+                "time": "09:00:00",
+                "color": "#FF5733",
+                "type": "colegio",
+            },
+            {"name": "Lengua", "days": ["Martes"], "time": "09:00:00", "color": "#33FF57", "type": "colegio"},
+        ]
+
+        response = await async_client.post(
+            f"/api/v1/students/{sample_student.id}/subjects/bulk", json=payload, headers=headers
+        )
+        assert response.status_code == 409
+        assert response.json()["detail"]["conflicts"][0]["name"] == "Old Subject"
+
+        response = await async_client.post(
+            f"/api/v1/students/{sample_student.id}/subjects/bulk?replace=true", json=payload, headers=headers
+        )
+        assert response.status_code == 201
+        assert [s["name"] for s in response.json()] == ["Matemáticas", "Lengua"]
+        assert response.json()[0]["days"] == ["Lunes", "Miércoles"]
+
+        subjects_list = (
+            await async_client.get(f"/api/v1/students/{sample_student.id}/subjects", headers=headers)
+        ).json()
+        assert sorted(s["name"] for s in subjects_list) == ["Lengua", "Matemáticas"]
+
+    async def test_bulk_create_detects_conflicts_within_batch(
+        self, async_client: httpx.AsyncClient, auth_headers, sample_student, db_session
+    ):
+        """Test that two items of the same import sharing a slot conflict with each other"""
+        headers, user = auth_headers
+
+        payload = [
+            {"name": "Inglés", "days": ["Jueves"], "time": "11:00:00", "color": "#FF5733", "type": "colegio"},
+            {"name": "Música", "days": ["Jueves"], "time": "11:00:00", "color": "#33FF57", "type": "colegio"},
+        ]
+
+        response = await async_client.post(
+            f"/api/v1/students/{sample_student.id}/subjects/bulk", json=payload, headers=headers
+        )
+        assert response.status_code == 409
+        assert response.json()["detail"]["conflicts"] == [
+            {"id": None, "name": "Inglés", "days": ["Jueves"], "time": "11:00"}
+        ]
+
+        # With replace the later item wins
+        response = await async_client.post(
+            f"/api/v1/students/{sample_student.id}/subjects/bulk?replace=true", json=payload, headers=headers
+        )
+        assert response.status_code == 201
+        assert [s["name"] for s in response.json()] == ["Música"]
+
+    async def test_subject_type_case_insensitive(
+        self, async_client: httpx.AsyncClient, auth_headers, sample_student, db_session
+    ):
         """Test that subject type is case insensitive"""
         headers, user = auth_headers
 
@@ -442,14 +563,18 @@ class TestSubjectEndpointsSerialization:
             "type": "COLEGIO",  # Uppercase
         }
 
-        response = client.post(f"/api/v1/students/{sample_student.id}/subjects", json=payload, headers=headers)
+        response = await async_client.post(
+            f"/api/v1/students/{sample_student.id}/subjects", json=payload, headers=headers
+        )
 
         assert response.status_code == 201
         data = response.json()
         # Should be normalized to lowercase
         assert data["type"] == "colegio"
 
-    def test_multiple_students_no_subject_recursion(self, client: TestClient, auth_headers, db_session):
+    async def test_multiple_students_no_subject_recursion(
+        self, async_client: httpx.AsyncClient, auth_headers, db_session
+    ):
         """Test with multiple students to ensure no cross-contamination"""
         headers, user = auth_headers
 
@@ -458,34 +583,36 @@ class TestSubjectEndpointsSerialization:
         student2 = StudentProfile(user_id=user.id, name="Student 2", school="School 2", grade="6th")
         db_session.add_all([student1, student2])
         db_session.commit()
-        db_session.refresh(student1)
-        db_session.refresh(student2)
 
         from src.infrastructure.repositories.subject_repository import SubjectRepository
 
         repo = SubjectRepository(db_session)
 
-        # Create subjects for each student
+        # Create subjects for each student (one batched INSERT and commit per student)
         for student in [student1, student2]:
-            for i in range(3):
-                repo.create(
-                    student_id=student.id,
-                    name=f"Subject {i}",
-                    days=["Lunes"],
-                    time=time(9 + i, 0),
-                    teacher=f"Teacher {i}",
-                    color="#FF0000",
-                    type="colegio",
-                )
+            repo.create_many(
+                student.id,
+                [
+                    {
+                        "name": f"Subject {i}",
+                        "days": ["Lunes"],
+                        "time": time(9 + i, 0),
+                        "teacher": f"Teacher {i}",
+                        "color": "#FF0000",
+                        "type": "colegio",
+                    }
+                    for i in range(3)
+                ],
+            )
 
         # Get subjects for student1
-        response1 = client.get(f"/api/v1/students/{student1.id}/subjects", headers=headers)
+        response1 = await async_client.get(f"/api/v1/students/{student1.id}/subjects", headers=headers)
         assert response1.status_code == 200
         data1 = response1.json()
         assert len(data1) == 3
 
         # Get subjects for student2
-        response2 = client.get(f"/api/v1/students/{student2.id}/subjects", headers=headers)
+        response2 = await async_client.get(f"/api/v1/students/{student2.id}/subjects", headers=headers)
         assert response2.status_code == 200
         data2 = response2.json()
         assert len(data2) == 3
@@ -3,31 +3,7 @@ Integration tests for User API endpoints.
 Following TDD principles - write tests first, then implement.
 """
 
-import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
-
-from src.infrastructure.api.rate_limit import limiter
-from src.infrastructure.database import get_db
-from src.main import app
-
-
-@pytest.fixture
-def client(db_session: Session):
-    """Create test client with database override."""
-    # Resetear rate limiter entre tests para evitar falsos 429
-    limiter._limiter.storage.reset()
-
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
-
-    app.dependency_overrides[get_db] = override_get_db
-    client = TestClient(app)
-    yield client
-    app.dependency_overrides.clear()
 
 
 class TestUserEndpoints:
@@ -135,19 +111,13 @@ class TestUserEndpoints:
         data = response.json()
         assert "detail" in data
 
-    def test_get_current_user_success(self, client: TestClient):
+    def test_get_current_user_success(self, client: TestClient, make_auth_headers):
         """Test GET /api/v1/users/me - get current authenticated user."""
-        # Arrange - Register and login
-        register_payload = {"email": "current@example.com", "password": "SecurePass123!", "name": "Current User"}
-        client.post("/api/v1/auth/register", json=register_payload)
-
-        login_response = client.post(
-            "/api/v1/auth/login", json={"email": "current@example.com", "password": "SecurePass123!"}
-        )
-        token = login_response.json()["access_token"]
+        # Arrange - Insert the user and mint its token directly; register/login are covered above
+        headers, _ = make_auth_headers("current@example.com", "Current User")
 
         # Act - Get current user
-        response = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"})
+        response = client.get("/api/v1/users/me", headers=headers)
 
         # Assert
         assert response.status_code == 200
@@ -171,7 +141,7 @@ class TestUserEndpoints:
         # Assert
         assert response.status_code == 401
 
-    def test_login_rate_limit(self, client: TestClient):
+    def test_login_rate_limit(self, client: TestClient, rate_limiter):
         """Test POST /api/v1/auth/login - rate limited after 5 requests per minute."""
         # Arrange
         login_payload = {"email": "ratelimit@example.com", "password": "SomePass123!"}
@@ -1,15 +1,21 @@
 import uuid
 from datetime import time
 
-# Skip these integration tests if docker is not available
-import docker
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from src.application.exceptions import ConflictError
+from src.domain.models import StudentProfile, SubjectType, User
+from src.infrastructure.database import Base
+from src.infrastructure.repositories.subject_repository import SubjectRepository
+
 
 def _docker_available() -> bool:
+    # Imported here so collecting this module stays cheap (and works) without the Docker SDK
     try:
+        import docker
+
         client = docker.from_env()
         client.ping()
         return True
@@ -17,20 +23,14 @@ def _docker_available() -> bool:
         return False
 
 
-from testcontainers.postgres import PostgresContainer
-
-from src.application.exceptions import ConflictError
-from src.domain.models import StudentProfile, SubjectType, User
-from src.infrastructure.database import Base
-from src.infrastructure.repositories.subject_repository import SubjectRepository
-
-
 @pytest.mark.integration
 @pytest.mark.skipif(not _docker_available(), reason="Docker not available, skipping heavy integration tests")
 def test_uppercase_days_normalized_and_conflict_detection():
     """Ensure uppercase enum names in input (e.g., 'LUNES') are normalized
     and do not cause PostgreSQL invalid enum errors. Also verify conflict detection.
     """
+    from testcontainers.postgres import PostgresContainer
+
     with PostgresContainer("postgres:15-alpine") as pg:
         engine = create_engine(pg.get_connection_url())
         Base.metadata.create_all(engine)
@@ -83,6 +83,8 @@ def test_replace_conflicting_subjects_with_uppercase_days():
     """When replace=True and input days are uppercase names, old subjects are soft-deleted
     and a new subject is created successfully.
     """
+    from testcontainers.postgres import PostgresContainer
+
     with PostgresContainer("postgres:15-alpine") as pg:
         engine = create_engine(pg.get_connection_url())
         Base.metadata.create_all(engine)
@@ -0,0 +1,3 @@
+"""
+Dependencies tests package.
+"""
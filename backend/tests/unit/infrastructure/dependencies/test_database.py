@@ -0,0 +1,61 @@
+"""
+Unit tests for the request-scoped database session dependency.
+"""
+
+import pytest
+
+from src.infrastructure.api.dependencies import database as database_module
+from src.infrastructure.api.dependencies.database import get_db
+
+
+class RecordingSession:
+    """Stands in for a SessionLocal() session and records what get_db does with it."""
+
+    def __init__(self):
+        self.calls = []
+
+    def commit(self):
+        self.calls.append("commit")
+
+    def rollback(self):
+        self.calls.append("rollback")
+
+    def close(self):
+        self.calls.append("close")
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = RecordingSession()
+    monkeypatch.setattr(database_module, "SessionLocal", lambda: session)
+    return session
+
+
+class TestGetDb:
+    """Test cases for get_db's commit/rollback handling."""
+
+    def test_commits_and_closes_when_request_succeeds(self, session):
+        """Test that the session is committed once and closed after a successful request."""
+        # Arrange
+        gen = get_db()
+
+        # Act - FastAPI resumes the generator after the endpoint returns
+        assert next(gen) is session
+        with pytest.raises(StopIteration):
+            next(gen)
+
+        # Assert
+        assert session.calls == ["commit", "close"]
+
+    def test_rolls_back_and_closes_when_request_raises(self, session):
+        """Test that an exception in the endpoint rolls back, closes and propagates."""
+        # Arrange
+        gen = get_db()
+        next(gen)
+
+        # Act - FastAPI throws the endpoint's exception into the generator
+        with pytest.raises(ValueError, match="boom"):
+            gen.throw(ValueError("boom"))
+
+        # Assert
+        assert session.calls == ["rollback", "close"]
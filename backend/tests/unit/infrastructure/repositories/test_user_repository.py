@@ -3,9 +3,11 @@ Unit tests for User Repository.
 Following TDD principles - write tests first, then implement.
 """
 
-from uuid import UUID
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
 
 import pytest
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.orm import Session
 
 from src.domain.models import User
@@ -68,6 +70,62 @@ class TestUserRepository:
         # Assert
         assert user is None
 
+    def test_get_by_id_accepts_string_id(self, db_session: Session, sample_user_data):
+        """Test retrieving a user by the string form of its ID (e.g. a JWT subject)."""
+        # Arrange
+        repo = UserRepository(db_session)
+        created_user = repo.create(
+            email=sample_user_data["email"],
+            name=sample_user_data["name"],
+            password_hash=sample_user_data["password_hash"],
+        )
+
+        # Act
+        retrieved_user = repo.get_by_id(str(created_user.id).upper())
+        invalid = repo.get_by_id("not-a-uuid")
+
+        # Assert
+        assert retrieved_user is not None
+        assert retrieved_user.id == created_user.id
+        assert invalid is None
+
+    def test_get_by_id_repeat_lookup_hits_identity_map(self, db_session: Session, sample_user_data, query_counter):
+        """Test that a second lookup of a loaded user emits no SQL."""
+        # Arrange
+        repo = UserRepository(db_session)
+        user = repo.create(
+            email=sample_user_data["email"],
+            name=sample_user_data["name"],
+            password_hash=sample_user_data["password_hash"],
+        )
+        repo.get_by_id(user.id)
+        query_counter.clear()
+
+        # Act
+        found_user = repo.get_by_id(user.id)
+
+        # Assert
+        assert found_user is user
+        assert query_counter == []
+
+    def test_get_by_email_raises_on_lazy_relationship_load(self, db_session: Session, sample_user_data):
+        """Test that relationships are not silently loaded from users returned for auth."""
+        # Arrange
+        repo = UserRepository(db_session)
+        repo.create(
+            email=sample_user_data["email"],
+            name=sample_user_data["name"],
+            password_hash=sample_user_data["password_hash"],
+        )
+        db_session.expunge_all()
+
+        # Act
+        found_user = repo.get_by_email(sample_user_data["email"])
+
+        # Assert
+        with pytest.raises(InvalidRequestError):
+            found_user.student_profiles
+
     def test_get_by_email_existing_user(self, db_session: Session, sample_user_data):
         """Test retrieving a user by email."""
         # Arrange
@@ -136,6 +194,45 @@ class TestUserRepository:
         assert updated_user.email == new_email
         assert updated_user.updated_at > updated_user.created_at
 
+    def test_update_ignores_non_updatable_fields(self, db_session: Session, sample_user_data):
+        """Test that update only touches the whitelisted user columns."""
+        # Arrange
+        repo = UserRepository(db_session)
+        user = repo.create(
+            email=sample_user_data["email"],
+            name=sample_user_data["name"],
+            password_hash=sample_user_data["password_hash"],
+        )
+        original_id = user.id
+
+        # Act
+        updated_user = repo.update(user.id, name="Updated Name", id=uuid4(), deleted_at=datetime.now(timezone.utc))
+
+        # Assert
+        assert updated_user is not None
+        assert updated_user.name == "Updated Name"
+        assert updated_user.id == original_id
+        assert updated_user.deleted_at is None
+
+    def test_update_refreshes_loaded_user(self, db_session: Session, sample_user_data):
+        """Test that an already loaded user sees the values written by update."""
+        # Arrange
+        repo = UserRepository(db_session)
+        user = repo.create(
+            email=sample_user_data["email"],
+            name=sample_user_data["name"],
+            password_hash=sample_user_data["password_hash"],
+        )
+        loaded = repo.get_by_id(user.id)
+
+        # Act
+        updated_user = repo.update(user.id, name="Updated Name")
+
+        # Assert
+        assert updated_user is loaded
+        assert loaded.name == "Updated Name"
+        assert loaded.updated_at is not None
+
     def test_update_non_existing_user(self, db_session: Session):
         """Test updating a non-existing user returns None."""
         # Arrange
@@ -167,6 +264,23 @@ class TestUserRepository:
         assert deleted_user is not None
         assert deleted_user.deleted_at is not None
 
+    def test_delete_already_deleted_user(self, db_session: Session, sample_user_data):
+        """Test that soft deleting a user twice reports False the second time."""
+        # Arrange
+        repo = UserRepository(db_session)
+        user = repo.create(
+            email=sample_user_data["email"],
+            name=sample_user_data["name"],
+            password_hash=sample_user_data["password_hash"],
+        )
+        repo.delete(user.id)
+
+        # Act
+        result = repo.delete(user.id)
+
+        # Assert
+        assert result is False
+
     def test_delete_non_existing_user(self, db_session: Session):
         """Test deleting a non-existing user returns False."""
         # Arrange
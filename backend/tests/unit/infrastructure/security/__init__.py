@@ -0,0 +1,3 @@
+"""
+Security tests package.
+"""
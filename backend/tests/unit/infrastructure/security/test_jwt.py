@@ -0,0 +1,65 @@
+"""
+Unit tests for JWT helpers.
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from src.infrastructure.security import jwt as jwt_module
+from src.infrastructure.security.jwt import create_access_token, decode_access_token
+
+
+@pytest.fixture(autouse=True)
+def clear_jwt_cache():
+    jwt_module._JWT_CACHE.clear()
+    yield
+    jwt_module._JWT_CACHE.clear()
+
+
+class TestDecodeAccessToken:
+    """Test cases for decode_access_token caching."""
+
+    def test_repeated_decode_verifies_signature_once(self, monkeypatch):
+        """Test that the same token is only verified on the first call."""
+        # Arrange
+        token = create_access_token({"sub": "user-1"})
+        calls = []
+        real_decode = jwt_module.jwt.decode
+
+        def counting_decode(*args, **kwargs):
+            calls.append(1)
+            return real_decode(*args, **kwargs)
+
+        monkeypatch.setattr(jwt_module.jwt, "decode", counting_decode)
+
+        # Act
+        first = decode_access_token(token)
+        first["sub"] = "tampered"
+        second = decode_access_token(token)
+
+        # Assert
+        assert second["sub"] == "user-1"
+        assert len(calls) == 1
+
+    def test_invalid_token_returns_none(self):
+        """Test that invalid tokens decode to None, also when served from cache."""
+        assert decode_access_token("not-a-token") is None
+        assert decode_access_token("not-a-token") is None
+
+    def test_expired_token_is_not_cached(self):
+        """Test that an already expired token is rejected."""
+        token = create_access_token({"sub": "user-1"}, expires_delta=timedelta(seconds=-10))
+
+        assert decode_access_token(token) is None
+
+    def test_token_signed_with_other_secret_is_rejected(self, monkeypatch):
+        """Test that the cached signing key follows the configured secret."""
+        # Arrange
+        monkeypatch.setattr(jwt_module.settings, "secret_key", "another-secret-key-used-only-in-this-test")
+        token = create_access_token({"sub": "user-1"})
+        monkeypatch.undo()
+
+        # Act / Assert
+        assert decode_access_token(token) is None
+        assert decode_access_token(create_access_token({"sub": "user-1"}))["sub"] == "user-1"
@@ -0,0 +1,354 @@
+"""
+Unit tests for the Gemini service helpers (no calls reach the real API).
+"""
+
+from datetime import date
+from string import Template
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from src.infrastructure.services import gemini_service as gemini_module
+from src.infrastructure.services.gemini_service import GeminiService, _extract_json, _PromptTemplate
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    gemini_module._response_cache.clear()
+    yield
+    gemini_module._response_cache.clear()
+
+
+@pytest.fixture
+def model_calls(monkeypatch):
+    """Replace the SDK call with a fake; append the next answer's text to `replies`."""
+    calls = SimpleNamespace(prompts=[], replies=[])
+
+    async def fake_generate(self, prompt):
+        calls.prompts.append(prompt)
+        return SimpleNamespace(text=calls.replies[len(calls.prompts) - 1])
+
+    monkeypatch.setattr(GeminiService, "_generate", fake_generate)
+    return calls
+
+
+class TestExtractJson:
+    """Test cases for stripping markdown fences from model output."""
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            '{"meal": "Tortilla"}',
+            '  \n{"meal": "Tortilla"}\n  ',
+            '```json\n{"meal": "Tortilla"}\n```',
+            '```\n{"meal": "Tortilla"}\n```',
+            '\n```json{"meal": "Tortilla"}```\n',
+        ],
+    )
+    def test_returns_payload_with_or_without_fences(self, text):
+        """Test that fenced and unfenced answers yield the same JSON payload."""
+        assert _extract_json(text) == '{"meal": "Tortilla"}'
+
+    def test_keeps_inner_backticks(self):
+        """Test that only the outer fence is removed."""
+        text = '```json\n{"meal": "Pasta `al dente`"}\n```'
+
+        assert orjson.loads(_extract_json(text)) == {"meal": "Pasta `al dente`"}
+
+    def test_malformed_output_is_returned_as_is(self):
+        """Test that non-JSON prose is passed through for the JSON parser to reject."""
+        text = "Lo siento, no puedo ayudarte con eso."
+
+        assert _extract_json(text) == text
+        with pytest.raises(orjson.JSONDecodeError):
+            orjson.loads(_extract_json(text))
+
+
+class TestGenerateJson:
+    """Test cases for parsing the model's answer."""
+
+    async def test_parses_fenced_answer(self, model_calls):
+        """Test that a fenced answer is parsed into Python objects."""
+        model_calls.replies.append('```json\n[{"category": "Frutas", "items": ["2 manzanas"]}]\n```')
+
+        result = await GeminiService()._generate_json("prompt")
+
+        assert result == [{"category": "Frutas", "items": ["2 manzanas"]}]
+
+    async def test_malformed_answer_raises(self, model_calls):
+        """Test that an answer that is not JSON raises instead of returning partial data."""
+        model_calls.replies.append('```json\n{"meal": "Tortilla"\n```')
+
+        with pytest.raises(orjson.JSONDecodeError):
+            await GeminiService()._generate_json("prompt")
+
+
+class TestResponseCache:
+    """Test cases for which Gemini answers are reused."""
+
+    async def test_repeated_dinner_suggestion_reaches_the_model(self, model_calls):
+        """Test that asking again for the same day generates a new suggestion."""
+        # Arrange
+        model_calls.replies += ['{"meal": "Tortilla", "ingredients": []}', '{"meal": "Crema", "ingredients": []}']
+        service = GeminiService()
+        args = (date(2026, 10, 17), None, [], [], [])
+
+        # Act
+        first = await service.suggest_dinner_for_day(*args)
+        second = await service.suggest_dinner_for_day(*args)
+
+        # Assert
+        assert len(model_calls.prompts) == 2
+        assert model_calls.prompts[0] == model_calls.prompts[1]
+        assert (first["meal"], second["meal"]) == ("Tortilla", "Crema")
+
+    async def test_repeated_week_plan_reaches_the_model(self, model_calls):
+        """Test that regenerating a week plan is not served from the cache."""
+        model_calls.replies += ["[]", "[]"]
+        service = GeminiService()
+
+        await service.suggest_dinners_for_week(date(2026, 10, 19), 7, [], [], [])
+        await service.suggest_dinners_for_week(date(2026, 10, 19), 7, [], [], [])
+
+        assert len(model_calls.prompts) == 2
+
+    async def test_shopping_list_for_same_dinners_is_reused(self, model_calls):
+        """Test that an identical shopping list request skips the model call."""
+        # Arrange
+        model_calls.replies.append('[{"category": "Huevos", "items": ["6 huevos"]}]')
+        service = GeminiService()
+        dinners = [{"meal": "Tortilla", "ingredients": ["huevos", "patata"]}]
+
+        # Act
+        first = await service.generate_shopping_list(dinners, num_people=2)
+        first[0]["items"].append("mutated")
+        second = await service.generate_shopping_list(dinners, num_people=2)
+
+        # Assert
+        assert len(model_calls.prompts) == 1
+        assert second == [{"category": "Huevos", "items": ["6 huevos"]}]
+
+    async def test_shopping_list_cache_can_be_disabled(self, model_calls, monkeypatch):
+        """Test that a zero TTL sends every shopping list request to the model."""
+        monkeypatch.setattr(gemini_module.settings, "gemini_cache_ttl_seconds", 0)
+        model_calls.replies += ["[]", "[]"]
+        service = GeminiService()
+        dinners = [{"meal": "Tortilla", "ingredients": ["huevos"]}]
+
+        await service.generate_shopping_list(dinners)
+        await service.generate_shopping_list(dinners)
+
+        assert len(model_calls.prompts) == 2
+
+
+# The f-string prompts GeminiService built before the prompt templates, kept verbatim as the
+# expected output: the templates must render byte-identical prompts.
+def _f_string_day_prompt(day_context, week_context, restrictions, prompt_instruction):
+    return f"""Eres un nutricionista experto especializado en alimentación infantil.
+
+{day_context}
+{week_context}
+
+{restrictions}
+
+🎯 TAREA:
+{prompt_instruction}
+
+📋 REQUISITOS:
+- La cena debe ser saludable, equilibrada y apropiada para niños
+- Incluir proteínas, verduras/vegetales y carbohidratos en proporciones adecuadas
+- Evitar repetir los mismos ingredientes principales del menú escolar
+- Considerar el equilibrio nutricional de toda la semana
+- Respetar ESTRICTAMENTE las restricciones alimentarias
+- Proponer un plato real y apetecible para un niño
+
+📤 FORMATO DE RESPUESTA:
+Responde SOLO con un objeto JSON válido con esta estructura exacta:
+{{
+    "meal": "Nombre completo del plato sugerido (ej: 'Pechuga de pollo a la plancha con ensalada mixta')",
+    "ingredients": ["ingrediente1", "ingrediente2", "ingrediente3", ...]
+}}
+
+IMPORTANTE: No incluyas explicaciones adicionales, solo el JSON."""
+
+
+def _f_string_week_prompt(days, days_context, restrictions):
+    return f"""Eres un nutricionista experto especializado en planificación de menús infantiles semanales.
+
+🗓️ PLANIFICACIÓN DE CENAS PARA {days} DÍAS:
+{days_context}
+
+{restrictions}
+
+🎯 TAREA:
+Crea un plan de cenas para estos {days} días que:
+1. COMPLEMENTE el menú escolar cuando existe
+2. SEA COMPLETO Y EQUILIBRADO cuando no hay menú escolar
+3. VARÍE los ingredientes principales entre días
+4. MANTENGA EQUILIBRIO NUTRICIONAL durante toda la semana
+5. SEA APETECIBLE para niños
+
+📋 REQUISITOS:
+- Cada cena debe incluir proteínas, verduras y carbohidratos
+- Máxima variedad de ingredientes entre días
+- Respetar ESTRICTAMENTE las restricciones alimentarias
+- Platos reales y prácticos de preparar
+- Considerar que los días con menú escolar la cena debe ser COMPLEMENTARIA
+- Los días sin menú escolar la cena debe ser MÁS COMPLETA
+
+📤 FORMATO DE RESPUESTA:
+Responde SOLO con un array JSON válido con esta estructura exacta:
+[
+    {{
+        "date": "YYYY-MM-DD",
+        "meal": "Nombre del plato",
+        "ingredients": ["ingrediente1", "ingrediente2", ...]
+    }},
+    ...
+]
+
+IMPORTANTE: Debe haber exactamente {days} cenas en el array, una por cada día. No incluyas explicaciones, solo el JSON."""
+
+
+def _f_string_shopping_list_prompt(meals_text, num_people):
+    return f"""Eres un asistente de compras experto especializado en planificación de cenas ligeras.
+
+🛒 CENAS PLANIFICADAS:
+{meals_text}
+
+👥 NÚMERO DE COMENSALES: {num_people} personas
+
+🎯 TAREA:
+Crea una lista de la compra organizada por categorías con TODOS los ingredientes necesarios para CENAS LIGERAS.
+
+📋 REQUISITOS IMPORTANTES:
+- **CANTIDADES PARA CENAS LIGERAS**: Las porciones deben ser apropiadas para una cena, NO para comida principal
+- Las cantidades deben ser para {num_people} personas
+- Agrupar ingredientes por categoría (Carnes y Pescados, Verduras y Hortalizas, Frutas, Lácteos y Huevos, Despensa, Congelados, etc.)
+- Eliminar duplicados y sumar cantidades de ingredientes repetidos
+- Usar cantidades específicas y realistas (ej: "500g de pollo", "2 tomates", "1 litro de leche")
+- Para cenas ligeras, reduce las cantidades en un 25-30% respecto a una comida principal
+- Incluir ingredientes básicos necesarios (aceite, sal, especias básicas)
+- Pensar en cantidades que se venden normalmente en supermercados
+
+💡 EJEMPLO DE CANTIDADES LIGERAS (para 4 personas):
+- Proteína: 400-500g (100-125g por persona)
+- Verduras: 600-800g
+- Carbohidratos: 300-400g (pasta, arroz, pan)
+
+📤 FORMATO DE RESPUESTA:
+Responde SOLO con un array JSON válido:
+[
+    {{
+        "category": "Nombre de categoría",
+        "items": ["cantidad + ingrediente", "cantidad + ingrediente", ...]
+    }},
+    ...
+]
+
+Ejemplo:
+[
+    {{
+        "category": "Carnes y Pescados",
+        "items": ["400g de pechuga de pollo", "300g de salmón fresco"]
+    }},
+    {{
+        "category": "Verduras y Hortalizas",
+        "items": ["4 tomates medianos", "1 lechuga", "2 pimientos rojos"]
+    }}
+]
+
+IMPORTANTE: Solo el JSON, sin explicaciones adicionales. Las cantidades deben ser para CENAS LIGERAS."""
+
+
+class TestPromptTemplate:
+    """Test cases for _PromptTemplate rendering."""
+
+    @pytest.mark.parametrize(
+        "template",
+        [
+            "Hola $name, tienes ${count} cenas",
+            "$name",
+            "${name}${count}",
+            "sin marcadores",
+            "cuesta $$5 y $$$count euros, $name",
+        ],
+    )
+    def test_substitute_matches_string_template(self, template):
+        """Test that rendering equals string.Template.substitute for the same values."""
+        values = {"name": "Ana", "count": 3}
+
+        assert _PromptTemplate(template).substitute(**values) == Template(template).substitute(**values)
+
+    def test_invalid_placeholder_raises_at_construction(self):
+        """Test that a malformed placeholder is rejected when the template is built."""
+        with pytest.raises(ValueError, match="Invalid placeholder"):
+            _PromptTemplate("Precio: $ 5")
+
+    def test_missing_value_raises(self):
+        """Test that substitute() requires every placeholder."""
+        with pytest.raises(KeyError):
+            _PromptTemplate("Hola $name").substitute()
+
+    async def test_day_prompt_matches_f_string(self, model_calls):
+        """Test the day prompt with a school menu against the original f-string."""
+        model_calls.replies.append('{"meal": "Tortilla", "ingredients": []}')
+        school_menu = {"date": "2026-10-16", "first_course": "Lentejas", "second_course": "Merluza", "dessert": "Fruta"}
+        week_menus = [{"date": "2026-10-15", "first_course": "Arroz"}, school_menu]
+
+        await GeminiService().suggest_dinner_for_day(date(2026, 10, 16), school_menu, week_menus, ["Gluten"], [])
+
+        assert model_calls.prompts[0] == _f_string_day_prompt(
+            day_context="🍽️ MENÚ ESCOLAR DEL DÍA (2026-10-16):\n"
+            "Primer plato: Lentejas\nSegundo plato: Merluza\nPostre: Fruta",
+            week_context="\n\n📅 MENÚS DE LA SEMANA (para equilibrio nutricional):\n"
+            "2026-10-15: Arroz\n2026-10-16: Lentejas, Merluza",
+            restrictions="⚠️ RESTRICCIONES CRÍTICAS - ALERGIAS: gluten. "
+            "NUNCA incluir estos ingredientes bajo ninguna circunstancia.",
+            prompt_instruction="Sugiere una cena COMPLEMENTARIA Y EQUILIBRADA que complete nutricionalmente "
+            "lo que el niño comió en el colegio.",
+        )
+
+    async def test_day_prompt_without_menu_matches_f_string(self, model_calls):
+        """Test the weekend/holiday day prompt against the original f-string."""
+        model_calls.replies.append('{"meal": "Tortilla", "ingredients": []}')
+
+        await GeminiService().suggest_dinner_for_day(date(2026, 10, 17), None, [], [], [])
+
+        assert model_calls.prompts[0] == _f_string_day_prompt(
+            day_context="🏠 DÍA SIN MENÚ ESCOLAR (2026-10-17) - Fin de semana o festivo",
+            week_context="",
+            restrictions="",
+            prompt_instruction="Sugiere una cena COMPLETA Y EQUILIBRADA. Analiza los menús de la semana para "
+            "evitar repetir ingredientes principales y mantener variedad nutricional.",
+        )
+
+    async def test_week_prompt_matches_f_string(self, model_calls):
+        """Test the week plan prompt against the original f-string."""
+        model_calls.replies.append("[]")
+        menus = [{"date": "2026-10-16", "first_course": "Lentejas", "second_course": "Merluza"}]
+
+        await GeminiService().suggest_dinners_for_week(date(2026, 10, 16), 3, menus, [], ["Cebolla"])
+
+        assert model_calls.prompts[0] == _f_string_week_prompt(
+            days=3,
+            days_context="📅 2026-10-16 (Friday): MENÚ ESCOLAR - Lentejas, Merluza\n"
+            "📅 2026-10-17 (Saturday): SIN MENÚ ESCOLAR (fin de semana/festivo)\n"
+            "📅 2026-10-18 (Sunday): SIN MENÚ ESCOLAR (fin de semana/festivo)",
+            restrictions="❌ NO incluir estos ingredientes: cebolla.",
+        )
+
+    async def test_shopping_list_prompt_matches_f_string(self, model_calls):
+        """Test the shopping list prompt against the original f-string."""
+        model_calls.replies.append("[]")
+        dinners = [
+            {"meal": "Tortilla", "ingredients": ["huevos", "patata"]},
+            {"meal": "Crema de calabaza", "ingredients": ["calabaza"]},
+        ]
+
+        await GeminiService().generate_shopping_list(dinners, num_people=3)
+
+        assert model_calls.prompts[0] == _f_string_shopping_list_prompt(
+            meals_text="- Tortilla: huevos, patata\n- Crema de calabaza: calabaza", num_people=3
+        )
@@ -19,6 +19,9 @@ def test_get_conflicting_calls_normalize_and_queries(monkeypatch):
         def __init__(self):
             self.filter_args = None
 
+        def options(self, *args):
+            return self
+
         def filter(self, *args):
             self.filter_args = args
             return self
@@ -55,6 +58,12 @@ def test_create_uses_normalize_and_adds_subject(monkeypatch):
             self.filter_args = args
             return self
 
+        def limit(self, n):
+            return self
+
+        def first(self):
+            return None
+
         def all(self):
             return []
 
@@ -93,5 +102,90 @@ def test_create_uses_normalize_and_adds_subject(monkeypatch):
     assert repo.db.added is not None
     assert hasattr(repo.db.added, "days")
     assert repo.db.added.days == ["Martes"]
+    assert repo.db.added.days_mask == 2
     assert repo.db.committed is True
     assert subj is not None
+
+
+def test_create_skips_get_conflicting_when_no_conflict_exists(monkeypatch):
+    repo = SubjectRepository(None)
+
+    monkeypatch.setattr(repo, "_exists_conflict", lambda student_id, days, time: False)
+
+    def fail_get_conflicting(*args, **kwargs):
+        raise AssertionError("get_conflicting should not be called on the no-conflict path")
+
+    monkeypatch.setattr(repo, "get_conflicting", fail_get_conflicting)
+
+    class DummySession:
+        def __init__(self):
+            self.added = None
+
+        def add(self, obj):
+            self.added = obj
+
+        def commit(self):
+            pass
+
+    repo.db = DummySession()
+
+    subj = repo.create(
+        student_id=uuid.uuid4(),
+        name="X",
+        days=["Lunes"],
+        time=time(8, 0),
+        teacher="T",
+        color="#ffffff",
+        type="colegio",
+    )
+
+    assert repo.db.added is subj
+    assert subj.days == ["Lunes"]
+
+
+def test_create_without_autocommit_only_flushes():
+    repo = SubjectRepository(None, autocommit=False)
+
+    class DummyQuery:
+        def filter(self, *args):
+            return self
+
+        def limit(self, n):
+            return self
+
+        def first(self):
+            return None
+
+    class DummySession:
+        def __init__(self):
+            self.calls = []
+
+        def query(self, model):
+            return DummyQuery()
+
+        def add(self, obj):
+            self.calls.append("add")
+
+        def flush(self):
+            self.calls.append("flush")
+
+        def commit(self):
+            self.calls.append("commit")
+
+        def refresh(self, obj):
+            self.calls.append("refresh")
+
+    repo.db = DummySession()
+
+    repo.create(
+        student_id=uuid.uuid4(),
+        name="X",
+        days=["Lunes"],
+        time=time(8, 0),
+        teacher="T",
+        color="#ffffff",
+        type="colegio",
+    )
+
+    # The request-scoped session dependency owns the commit
+    assert repo.db.calls == ["add", "flush"]
@@ -17,8 +17,22 @@ def test_normalize_days_various_cases_and_accents():
     assert result == ["Lunes", "Miércoles", "Sábado"]
 
 
+def test_normalize_days_folds_accents_in_any_case():
+    repo = SubjectRepository(None)
+    input_days = ["MIÉRCOLES", "sabado", " SÁBADO "]
+    result = repo._normalize_days(input_days)
+    assert result == ["Miércoles", "Sábado", "Sábado"]
+
+
 def test_normalize_ignores_invalid_entries():
     repo = SubjectRepository(None)
     input_days = ["LUNES", "NOTADAY", 123, None]
     result = repo._normalize_days(input_days)
     assert result == ["Lunes"]
+
+
+def test_days_mask_packs_one_bit_per_weekday():
+    assert SubjectRepository._days_mask([]) == 0
+    assert SubjectRepository._days_mask(["Lunes"]) == 1
+    assert SubjectRepository._days_mask(["Lunes", "Miércoles", "Viernes"]) == 1 | 4 | 16
+    assert SubjectRepository._days_mask(["Sábado", "Domingo"]) == 32 | 64